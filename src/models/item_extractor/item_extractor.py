@@ -1,53 +1,101 @@
 import sys
 import os
-from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+import textwrap
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from modules.pdf_reader.pdf_reader import PDFReader
 from dotenv import load_dotenv
 
+# Kept byte-identical across calls so OpenAI can reuse the cached prompt prefix
+SYSTEM_MESSAGE = textwrap.dedent("""
+    Te voy a pasar páginas del pliego de bases y condiciones de una licitación. La información de las páginas están organizadas en tres partes:
+    1 - Texto plano: Todo el texto plano que se pudo extraer del pdf
+    2 - Tablas Lattice: Las tablas con bordes que se pudieron detectar del pdf las columnas están separadas por "\t|\t" y las filas por "-"*30
+    3 - Tablas Stream: Las tablas sin bordes que se pudieron detectar del pdf las columnas están separadas por "\t|\t" y las filas por "-"*30
+
+    Necesito que identifiques si en la página están presentes items licitados (atendiendo que no se de condiciones del oferente ) y de ser así, que los enlistes y extraigas sus caracteristicas en este formato:
+
+    Nombre: <nombre del item>
+    Unidad de medida: <unidad de medida del item>
+    Cantidad solicitada: <cantidad solicitada del item>
+    <caracteristica 1>: <valor de la caracteristica 1>
+    <caracteristica 2>: <valor de la caracteristica 2>
+    .
+    .
+    <caracteristica n>: <valor de la caracteristica n>
+
+    Ten en cuenta que en la descripción misma de los ítems puede haber características que sirvan para clasificar el ítems, intenta extraer y estructurar toda la información que se pueda de los ítems de modo a luego poder compararlos por estas características. No te quedes solo con estructuras, clasificaciones y formatos dados por el documento.
+
+    No pongas limitaciones en el listado de los items, necesito que traigas todos los ítems sin importar la cantidad.
+
+    Un item generalmente tiene unidad de medida, cantidad solicitada. No todo lo que está en una tabla es un ítem. Por favor, tráeme solo lo que tengas una confianza mayor al 80% de que es un ítem de licitación.
+""").strip()
+
 class ItemExtractor:
     def __init__(self, pdf_path):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.pdf_path = pdf_path
-        self.system_message = """
-        Te voy a pasar páginas del pliego de bases y condiciones de una licitación. La información de las páginas están organizadas en tres partes:
-        1 - Texto plano: Todo el texto plano que se pudo extraer del pdf
-        2 - Tablas Lattice: Las tablas con bordes que se pudieron detectar del pdf las columnas están separadas por "\t|\t" y las filas por "-"*30
-        3 - Tablas Stream: Las tablas sin bordes que se pudieron detectar del pdf las columnas están separadas por "\t|\t" y las filas por "-"*30
+        self.system_message = SYSTEM_MESSAGE
+
+        # Built once: only the user message changes between calls
+        self._system_msg = SystemMessage(content=self.system_message)
+        # stream_usage reports usage (including cached_tokens) on streamed responses too
+        self.llm = ChatOpenAI(model="gpt-4o-mini", stream_usage=True)
 
-        Necesito que identifiques si en la página están presentes items licitados (atendiendo que no se de condiciones del oferente ) y de ser así, que los enlistes y extraigas sus caracteristicas en este formato:
+    def build_messages(self, text_input):
+        return [
+            self._system_msg,
+            HumanMessage(content=f"Extrae los items de la siguiente página: \n\n {text_input}")
+        ]
 
-        Nombre: <nombre del item>
-        Unidad de medida: <unidad de medida del item>
-        Cantidad solicitada: <cantidad solicitada del item>
-        <caracteristica 1>: <valor de la caracteristica 1>
-        <caracteristica 2>: <valor de la caracteristica 2>
-        .
-        .
-        <caracteristica n>: <valor de la caracteristica n>
+    def extract_items(self, text_input):
+        prompt = self.build_messages(text_input)
+        response = self.llm.invoke(prompt)
+        return response.content
 
-        Ten en cuenta que en la descripción misma de los ítems puede haber características que sirvan para clasificar el ítems, intenta extraer y estructurar toda la información que se pueda de los ítems de modo a luego poder compararlos por estas características. No te quedes solo con estructuras, clasificaciones y formatos dados por el documento.
+    def extract_items_stream(self, text_input):
+        """Yield the extracted items as the model generates them."""
+        prompt = self.build_messages(text_input)
+        for chunk in self.llm.stream(prompt):
+            yield chunk.content
 
-        No pongas limitaciones en el listado de los items, necesito que traigas todos los ítems sin importar la cantidad.
+    async def aextract_items(self, text_input):
+        prompt = self.build_messages(text_input)
+        response = await self.llm.ainvoke(prompt)
+        return response.content
 
-        Un item generalmente tiene unidad de medida, cantidad solicitada. No todo lo que está en una tabla es un ítem. Por favor, tráeme solo lo que tengas una confianza mayor al 80% de que es un ítem de licitación.
+    def extract_items_from_pages(self, pages, batch_size=3, max_concurrency=48):
+        """
+        Extract items from a list of page markdowns, sending batch_size pages per
+        request and running up to max_concurrency requests at the same time.
         """
+        batches = ["".join(pages[i:i + batch_size]) for i in range(0, len(pages), batch_size)]
+        return asyncio.run(self._aextract_batches(batches, max_concurrency))
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", self.system_message),
-            ("user", "Extrae los items de la siguiente página: \n\n {text_input}")
-        ])
-        self.llm = ChatOpenAI(model="gpt-4o-mini")
+    async def _aextract_batches(self, batches, max_concurrency):
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-    def extract_items(self, text_input):
-        prompt = self.prompt.format_messages(text_input=text_input)
-        response = self.llm.invoke(prompt)
-        return response.content
+        async def extract_batch(batch):
+            async with semaphore:
+                return await self.aextract_items(batch)
+
+        results = await asyncio.gather(*(extract_batch(batch) for batch in batches))
+        return "\n\n".join(results)
 
     def extract_items_from_pdf(self):
         pdf_reader = PDFReader(self.pdf_path)
-        pdf_text = pdf_reader.read_pdf_as_markdown()
-        return self.extract_items(pdf_text)
+        pages = pdf_reader.read_pdf_as_markdown_pages()
+        return self.extract_items_from_pages(pages)
+
+    def extract_items_from_pdf_stream(self, batch_size=3):
+        """Stream the items of the PDF batch by batch, in page order."""
+        pdf_reader = PDFReader(self.pdf_path)
+        pages = pdf_reader.read_pdf_as_markdown_pages()
+        for i in range(0, len(pages), batch_size):
+            if i > 0:
+                yield "\n\n"
+            yield from self.extract_items_stream("".join(pages[i:i + batch_size]))
 
 def main():
     if len(sys.argv) != 2:
@@ -56,8 +104,10 @@ def main():
     pdf_path = sys.argv[1]
     load_dotenv()
     item_extractor = ItemExtractor(pdf_path)
-    items = item_extractor.extract_items_from_pdf()
-    print(items)
+    for chunk in item_extractor.extract_items_from_pdf_stream():
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import sys
+
+from .pdf_reader import PDFReader
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python -m modules.pdf_reader <pdf_file_path>")
+        sys.exit(1)
+    
+    pdf_path = sys.argv[1]
+    
+    try:
+        pdf_reader = PDFReader(pdf_path)
+
+        # Stream each chunk of pages as soon as it is ready
+        for markdown in pdf_reader.iter_pdf_as_markdown():
+            sys.stdout.write(markdown)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
+        
+    except Exception as e:
+        print(f"Error processing PDF: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,12 +1,41 @@
 import pdfplumber
+import pypdfium2 as pdfium
 import camelot
+import gc
 import os
+import re
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+
+# pdfplumber table settings equivalent to camelot's stream flavor (borderless tables)
+STREAM_TABLE_SETTINGS = {
+    "vertical_strategy": "text",
+    "horizontal_strategy": "text",
+    "snap_tolerance": 3,
+}
+
+# Private-use bullet glyphs emitted by Word/Symbol fonts, mapped to markdown list markers
+_BULLET_MAP = {"\uf0d8": "- ", "\uf0b7": "\t- "}
+_BULLET_RE = re.compile("[\uf0d8\uf0b7]")
+
+# Render lattice pages in-process with PDFium (pypdfium2) instead of spawning Ghostscript
+CAMELOT_LATTICE_BACKEND = "pdfium"
+
+
+def _read_range_worker(args):
+    """Process pool entry point: pdfplumber objects can't be pickled, so each worker opens the PDF itself."""
+    pdf_path, start, stop = args
+    return PDFReader(pdf_path).read_range(start, stop)
 
 
 class PDFReader:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, max_workers=None, chunk_size=50):
         self.pdf_path = pdf_path
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self.chunk_size = chunk_size
+        self._pdf = None
+        self._pdfium = None
 
     def read_pdf(self):
         """
@@ -14,30 +43,104 @@ class PDFReader:
         Returns a list of dictionaries with page number, text content, and tables.
         """
         result = []
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            
-            for page_number in range(total_pages):
-                page_data = self.read_page(page_number)
-                result.append(page_data)
+        for pages in self.iter_page_chunks():
+            result.extend(pages)
+        return result
+
+    def iter_page_chunks(self):
+        """
+        Read the PDF in chunks of chunk_size pages, yielding the list of page
+        dictionaries of each chunk so callers can release them before the next one.
+        """
+        pdf = pdfium.PdfDocument(self.pdf_path)
+        try:
+            total_pages = len(pdf)
+        finally:
+            pdf.close()
+
+        workers = min(self.max_workers, self.chunk_size, total_pages)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for start in range(0, total_pages, self.chunk_size):
+                stop = min(start + self.chunk_size, total_pages)
+                yield self.read_pages(start, stop, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def read_pages(self, start, stop, executor=None):
+        """
+        Read pages [start, stop): one camelot pass for the lattice tables of the
+        whole range, and text plus stream tables split across the executor's workers.
+        """
+        lattice_tables = self.extract_all_tables(flavor='lattice', pages=f"{start + 1}-{stop}")
+
+        if executor is None:
+            pages_content = self.read_range(start, stop)
+        else:
+            # One sub-range per worker so each process parses the PDF only once
+            step = -(-(stop - start) // min(self.max_workers, stop - start))
+            ranges = [
+                (self.pdf_path, sub_start, min(sub_start + step, stop))
+                for sub_start in range(start, stop, step)
+            ]
+            chunks = executor.map(_read_range_worker, ranges)
+            pages_content = [page for chunk in chunks for page in chunk]
+
+        result = []
+        for page_number, (text_content, stream_tables) in enumerate(pages_content, start):
+            page_data = self.read_page(
+                page_number,
+                text_content=text_content,
+                lattice_tables=lattice_tables.get(page_number + 1, []),
+                stream_tables=stream_tables
+            )
+            result.append(page_data)
         
         return result
-    def read_page(self, page_number):
+
+    def read_range(self, start, stop):
+        """
+        Extract the text and stream tables of pages [start, stop) reusing a single open document.
+        Returns a list of (text, stream_tables) tuples.
+        """
+        with pdfplumber.open(self.pdf_path) as pdf:
+            # Reuse the open documents for every page instead of re-parsing them
+            self._pdf = pdf
+            self._pdfium = pdfium.PdfDocument(self.pdf_path)
+            try:
+                return [
+                    (self.extract_text(page_number) or "", self.extract_stream_tables(page_number))
+                    for page_number in range(start, stop)
+                ]
+            finally:
+                self._pdfium.close()
+                self._pdfium = None
+                self._pdf = None
+
+    def read_page(self, page_number, text_content=None, lattice_tables=None, stream_tables=None):
         """
         Read a specific page and extract text and tables.
 
         Args:
             page_number: 0-based page number
+            text_content: Pre-extracted text for this page (extracted if None)
+            lattice_tables: Pre-extracted lattice tables for this page (extracted if None)
+            stream_tables: Pre-extracted stream tables for this page (extracted if None)
 
         Returns:
             dict: Contains page number, text content, lattice tables, and stream tables
         """
         camelot_page_number = page_number + 1
 
-        text_content = self.extract_text(page_number)
-        lattice_tables_data = self.extract_tables(page_number)
-        stream_tables_data = self.extract_stream_tables(page_number)
+        if text_content is None:
+            text_content = self.extract_text(page_number)
+        lattice_tables_data = (
+            lattice_tables if lattice_tables is not None else self.extract_tables(page_number)
+        )
+        stream_tables_data = (
+            stream_tables if stream_tables is not None else self.extract_stream_tables(page_number)
+        )
 
         return {
             "page": camelot_page_number,  # 1-based page number for consistency
@@ -47,22 +150,65 @@ class PDFReader:
         }
 
     def extract_text(self, page_number):
-        """Extract text from a specific page."""
-        with pdfplumber.open(self.pdf_path) as pdf:
-            return pdf.pages[page_number].extract_text()
+        """Extract text from a specific page using PDFium, much faster than pdfminer."""
+        if self._pdfium is not None:
+            return self._extract_pdfium_text(self._pdfium, page_number)
+        pdf = pdfium.PdfDocument(self.pdf_path)
+        try:
+            return self._extract_pdfium_text(pdf, page_number)
+        finally:
+            pdf.close()
 
-    def extract_stream_tables(self, page_number):
-        """Extract stream tables from a specific page using camelot."""
-        camelot_page_number = page_number + 1
+    @staticmethod
+    def _extract_pdfium_text(pdf, page_number):
+        page = pdf[page_number]
+        text_page = page.get_textpage()
         try:
+            text = text_page.get_text_range()
+        finally:
+            text_page.close()
+            page.close()
+        # PDFium separates lines with CRLF
+        return text.replace("\r\n", "\n")
+
+    def extract_all_tables(self, flavor, pages='1-end'):
+        """
+        Extract tables of the given camelot flavor from a page range in a single call.
+        Returns a dict mapping 1-based page numbers to lists of matrices.
+        """
+        tables_by_page = {}
+        # Only the lattice parser rasterizes pages and accepts a backend
+        backend_kwargs = {"backend": CAMELOT_LATTICE_BACKEND} if flavor == 'lattice' else {}
+        try:
+            # Each page is rasterized exactly once; let camelot spread pages across
+            # at most max_workers cores (its own default is every core)
             tables = camelot.read_pdf(
-                self.pdf_path, 
-                flavor='stream', 
-                pages=str(camelot_page_number)
+                self.pdf_path,
+                flavor=flavor,
+                pages=pages,
+                parallel=self.max_workers > 1,
+                cpu_count=self.max_workers,
+                **backend_kwargs
             )
-            return [table.df.values.tolist() for table in tables]
         except Exception as e:
-            print(f"Warning: Could not extract stream tables from page {camelot_page_number}: {e}")
+            print(f"Warning: Could not extract {flavor} tables: {e}")
+            return tables_by_page
+        for table in tables:
+            tables_by_page.setdefault(int(table.page), []).append(self._table_to_matrix(table))
+            self._release_plot_data(table)
+        return tables_by_page
+
+    def extract_stream_tables(self, page_number):
+        """Extract stream (borderless) tables from a specific page using pdfplumber's text strategy."""
+        try:
+            if self._pdf is not None:
+                tables = self._pdf.pages[page_number].extract_tables(STREAM_TABLE_SETTINGS)
+            else:
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    tables = pdf.pages[page_number].extract_tables(STREAM_TABLE_SETTINGS)
+            return [self._clean_matrix(table) for table in tables]
+        except Exception as e:
+            print(f"Warning: Could not extract stream tables from page {page_number + 1}: {e}")
             return []
 
     def extract_tables(self, page_number):
@@ -72,55 +218,98 @@ class PDFReader:
             tables = camelot.read_pdf(
                 self.pdf_path, 
                 flavor='lattice', 
-                pages=str(camelot_page_number)
+                pages=str(camelot_page_number),
+                backend=CAMELOT_LATTICE_BACKEND
             )
-            return [table.df.values.tolist() for table in tables]
+            matrices = []
+            for table in tables:
+                matrices.append(self._table_to_matrix(table))
+                self._release_plot_data(table)
+            return matrices
         except Exception as e:
             print(f"Warning: Could not extract lattice tables from page {camelot_page_number}: {e}")
             return []
+
+    @staticmethod
+    def _release_plot_data(table):
+        """
+        Drop the page image and segments camelot keeps on each table only for plotting.
+        Attribute names vary across camelot versions, so only existing ones are cleared.
+        """
+        for attribute in ("_image", "_segments", "_text"):
+            if hasattr(table, attribute):
+                setattr(table, attribute, None)
+
+    @staticmethod
+    def _clean_matrix(matrix):
+        """Make pdfplumber table cells markdown-ready: None becomes "" and newlines <br>."""
+        return [
+            ["" if cell is None else cell.replace("\n", "<br>") for cell in row]
+            for row in matrix
+        ]
+
+    @staticmethod
+    def _table_to_matrix(table):
+        """Convert a camelot table to a matrix of markdown-ready cells, cleaned in vectorized pandas."""
+        df = table.df.fillna("").astype(str)
+        df = df.apply(lambda column: column.str.replace("\n", "<br>", regex=False))
+        return df.values.tolist()
+
     def table_matrix_to_markdown(self, table_matrix, header=True):
         """
         Convert a table in matrix (list of lists) format to a markdown table string.
         If header=True, the first row is treated as the header. If header=False, all rows are treated as data.
+        Cells are expected to be already cleaned strings (see _table_to_matrix).
         """
         if not table_matrix or not any(table_matrix):
             return ""
         if header and len(table_matrix) > 0:
             header_row = table_matrix[0]
-            data_rows = table_matrix[1:]
-            md = "| " + " | ".join(str(cell).replace("\n", "<br>") if cell is not None else "" for cell in header_row) + " |\n"
-            md += "| " + " | ".join("---" for _ in header_row) + " |\n"
-            for row in data_rows:
-                md += "| " + " | ".join(str(cell).replace("\n", "<br>") if cell is not None else "" for cell in row) + " |\n"
+            rows = [header_row, ["---"] * len(header_row), *table_matrix[1:]]
         else:
             # No header: treat all rows as data, use generic column names
             num_cols = max(len(row) for row in table_matrix)
-            md = "| " + " | ".join(f"col{i+1}" for i in range(num_cols)) + " |\n"
-            md += "| " + " | ".join("---" for _ in range(num_cols)) + " |\n"
-            for row in table_matrix:
-                # Pad row if it's shorter than num_cols
-                padded_row = list(row) + [""] * (num_cols - len(row))
-                md += "| " + " | ".join(str(cell).replace("\n", "<br>") if cell is not None else "" for cell in padded_row) + " |\n"
-        return md
+            rows = [[f"col{i+1}" for i in range(num_cols)], ["---"] * num_cols]
+            # Pad rows shorter than num_cols
+            rows.extend(list(row) + [""] * (num_cols - len(row)) for row in table_matrix)
+        return "\n".join("| " + " | ".join(row) + " |" for row in rows) + "\n"
 
     
     
-    def read_pdf_as_markdown(self):
-        pdf_data = self.read_pdf()
-        result = ""
-        for page in pdf_data:
-            result += f"\n\n## Page {page['page']}"
-            result += "\n\n" + page["text_content"]
-            lattice_tables = [self.table_matrix_to_markdown(table) for table in page["lattice_tables"]]
-            stream_tables = [self.table_matrix_to_markdown(table) for table in page["stream_tables"]]
-            result += "\n\n Lattice Tables:\n\n"
-            for i, table in enumerate(lattice_tables):
-                result += f"\n\n Table {i+1}:\n\n"
-                result += table + "\n\n"
-            result += "\n\n Stream Tables:\n" 
-            for i, table in enumerate(stream_tables):
-                result += f"\n\n Table {i+1}:\n\n"
-                result += table + "\n\n"
-            result += "$"*40 + "\n\n"
-        return result.replace("", "- ").replace("", "\t- ")
+    def page_to_markdown(self, page):
+        """Render a page dict produced by read_page as markdown."""
+        # Accumulate chunks and join once; repeated += is quadratic on large PDFs
+        parts = [f"\n\n## Page {page['page']}"]
+        parts.append("\n\n" + page["text_content"])
+        lattice_tables = [self.table_matrix_to_markdown(table) for table in page["lattice_tables"]]
+        stream_tables = [self.table_matrix_to_markdown(table) for table in page["stream_tables"]]
+        parts.append("\n\n Lattice Tables:\n\n")
+        for i, table in enumerate(lattice_tables):
+            parts.append(f"\n\n Table {i+1}:\n\n")
+            parts.append(table + "\n\n")
+        parts.append("\n\n Stream Tables:\n")
+        for i, table in enumerate(stream_tables):
+            parts.append(f"\n\n Table {i+1}:\n\n")
+            parts.append(table + "\n\n")
+        parts.append("$"*40 + "\n\n")
+        # Both bullet replacements in a single pass over the page
+        return _BULLET_RE.sub(lambda match: _BULLET_MAP[match.group(0)], "".join(parts))
+
+    def read_pdf_as_markdown_pages(self):
+        """Read the PDF and return the markdown of each page as a separate string."""
+        return [self.page_to_markdown(page) for page in self.read_pdf()]
+
+    def iter_pdf_as_markdown(self):
+        """
+        Yield the markdown of the PDF chunk by chunk (chunk_size pages at a time),
+        so memory is bounded by one chunk instead of the whole document.
+        """
+        for pages in self.iter_page_chunks():
+            markdown = "".join(self.page_to_markdown(page) for page in pages)
+            # Drop the chunk's tables before reading the next one
+            del pages
+            gc.collect()
+            yield markdown
 
+    def read_pdf_as_markdown(self):
+        return "".join(self.iter_pdf_as_markdown())
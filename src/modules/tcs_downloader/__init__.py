@@ -1,3 +1,3 @@
-from .tcs_downloader import TCSDownloader
+from .tcs_downloader import TCSDownloader, create_session, start_unoserver, stop_unoserver
 
-__all__ = ["TCSDownloader"]
\ No newline at end of file
+__all__ = ["TCSDownloader", "create_session", "start_unoserver", "stop_unoserver"]
\ No newline at end of file
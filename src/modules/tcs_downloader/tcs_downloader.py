@@ -1,14 +1,126 @@
+import atexit
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 from unidecode import unidecode
 import tempfile
 import os
+import re
 import zipfile
 import rarfile
-import pypandoc
 import subprocess
 import shutil
+import socket
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Callable, Optional, Union
+
+USER_AGENT = "public-road-works-analysis/0.1.0"
+# Tamaño de bloque al escribir descargas a disco
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Conexiones reutilizables por host: cubre las licitaciones concurrentes del scraper
+HTTP_POOL_SIZE = 32
+# Timeouts (conexión, lectura) en segundos: una conexión colgada no debe frenar al scraper
+API_TIMEOUT = (5, 30)
+DOWNLOAD_TIMEOUT = (5, 120)
+# Puerto XML-RPC del servidor persistente de LibreOffice (unoserver)
+UNOSERVER_PORT = 2003
+UNOSERVER_STARTUP_TIMEOUT = 30
+
+# Las respuestas de la API de licitaciones prácticamente no cambian: se cachean por un día
+TENDER_API_URL_PATTERN = "www.contrataciones.gov.py/datos/api/*"
+API_CACHE_EXPIRE_AFTER = 86400
+
+# Nombre (ya normalizado) de una PBC o carta de invitación en PDF o DOC/DOCX:
+# palabra clave en cualquier parte (lookahead) y extensión válida, en una sola pasada
+_VALID_DOCUMENT_RE = re.compile(r"(?=.*(?:pliego|pbc|carta|invitacion)).*\.(?:pdf|docx?)\Z", re.DOTALL)
+_VALID_EXTENSIONS = frozenset({".pdf", ".doc", ".docx"})
+_VALID_DOCUMENT_TYPES = frozenset({"pliego de bases y condiciones", "carta de invitacion"})
+
+# Tabla de plegado a ASCII para los caracteres acentuados del español
+_ASCII_FOLD_TABLE = str.maketrans("áéíóúüñÁÉÍÓÚÜÑ", "aeiouunAEIOUUN")
+
+@lru_cache(maxsize=4096)
+def _normalize(text: str) -> str:
+    """Quita acentos y pasa a minúsculas (cacheado: los nombres se repiten mucho)."""
+    folded = text.translate(_ASCII_FOLD_TABLE)
+    if not folded.isascii():
+        # Solo caracteres fuera del español pasan por unidecode
+        folded = unidecode(folded)
+    return folded.lower()
+
+def _read_pdf_as_markdown(pdf_path: str) -> str:
+    """Lee un PDF como markdown con PDFReader en el proceso actual."""
+    # Import diferido: evita cargar pdfplumber/camelot si solo se descargan documentos
+    from ..pdf_reader import PDFReader
+
+    return PDFReader(pdf_path).read_pdf_as_markdown()
+
+# Preferir el unrar nativo; si no está instalado rarfile prueba unar, 7z y bsdtar
+# (la herramienta elegida se cachea en el primer uso).
+rarfile.UNRAR_TOOL = "unrar"
+
+# Servidor unoserver compartido por todas las instancias (y los hilos que las usan)
+_unoserver_process: Optional[subprocess.Popen] = None
+_unoserver_lock = threading.Lock()
+
+def unoserver_available() -> bool:
+    """Indica si unoserver/unoconvert están instalados."""
+    return shutil.which("unoserver") is not None and shutil.which("unoconvert") is not None
+
+def _unoserver_listening() -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", UNOSERVER_PORT), timeout=1):
+            return True
+    except OSError:
+        return False
+
+def start_unoserver() -> None:
+    """
+    Inicia unoserver si no hay uno escuchando y espera a que acepte conexiones.
+
+    Una única instancia de LibreOffice se comparte entre todos los
+    TCSDownloader del proceso, evitando pagar su arranque en cada conversión.
+    Puede llamarse al inicio de un lote para tenerla lista de antemano.
+    """
+    global _unoserver_process
+    with _unoserver_lock:
+        if _unoserver_process is not None and _unoserver_process.poll() is None:
+            return
+        if _unoserver_listening():
+            return  # Iniciado por otro proceso: se reutiliza
+
+        _unoserver_process = subprocess.Popen(
+            ["unoserver", "--port", str(UNOSERVER_PORT)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        atexit.register(stop_unoserver)
+
+        deadline = time.monotonic() + UNOSERVER_STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if _unoserver_process.poll() is not None:
+                raise RuntimeError("unoserver terminó inesperadamente")
+            if _unoserver_listening():
+                return
+            time.sleep(0.2)
+        raise RuntimeError("unoserver no respondió a tiempo")
+
+def stop_unoserver() -> None:
+    """Termina el servidor unoserver si fue iniciado por este proceso."""
+    global _unoserver_process
+    with _unoserver_lock:
+        if _unoserver_process is not None and _unoserver_process.poll() is None:
+            _unoserver_process.terminate()
+            try:
+                _unoserver_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _unoserver_process.kill()
+        _unoserver_process = None
 
 # Excepciones personalizadas
 class TCSDownloaderError(Exception):
@@ -39,22 +151,113 @@ class ValidationError(TCSDownloaderError):
     """Error de validación de parámetros"""
     pass
 
+def create_session(cache_path: Optional[str] = None) -> requests.Session:
+    """
+    Crea una sesión HTTP con keep-alive, pool de conexiones y reintentos.
+
+    Reutilizar la sesión evita un handshake TCP+TLS por cada request
+    contra contrataciones.gov.py.
+
+    Args:
+        cache_path: Si se indica, las respuestas de la API de licitaciones se
+            cachean en una base SQLite en ese path (requiere requests-cache).
+            Los documentos descargados nunca se cachean.
+    """
+    if cache_path:
+        from requests_cache import CachedSession, DO_NOT_CACHE
+
+        session = CachedSession(
+            cache_path,
+            backend="sqlite",
+            allowable_methods=("GET",),
+            urls_expire_after={
+                TENDER_API_URL_PATTERN: API_CACHE_EXPIRE_AFTER,
+                "*": DO_NOT_CACHE,
+            }
+        )
+    else:
+        session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    # gzip/deflate siempre; br cuando brotli está instalado (la API devuelve JSON muy comprimible)
+    session.headers.update(make_headers(accept_encoding=True))
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 class TCSDownloader:
 
-    def get_document_list(self, tender_id: Union[str, int]) -> list[object]:
-        # Convertir a string y validar
+    # Tipo MIME por extensión del título del documento
+    _MIME_TYPES = {
+        ".pdf": "application/pdf",
+        ".doc": "application/msword",
+        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".zip": "application/zip",
+        ".rar": "application/x-rar-compressed",
+    }
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or create_session()
+        # Raíz de todos los temporales: cada operación usa un subdirectorio propio
+        self._tmp_root = tempfile.mkdtemp(prefix="tcs_")
+        atexit.register(shutil.rmtree, self._tmp_root, ignore_errors=True)
+        # Última licitación consultada: (tender_id, json)
+        self._last_tender: Optional[tuple[str, dict]] = None
+
+    def fetch_tender(self, tender_id: Union[str, int]) -> dict:
+        """
+        Obtiene el JSON de una licitación desde la API de contrataciones.
+
+        La última respuesta queda cacheada por ID, de modo que la lista de
+        documentos y la cantidad de oferentes salen de una sola consulta.
+
+        Args:
+            tender_id: ID de la licitación (puede ser str o int)
+
+        Returns:
+            dict: JSON de la licitación
+
+        Raises:
+            ValidationError: Si el tender_id es inválido
+            APIError: Si falla la consulta o la respuesta no es JSON
+        """
         if tender_id is None:
             raise ValidationError("tender_id no puede ser None")
         
         tender_id_str = str(tender_id).strip()
         if not tender_id_str:
             raise ValidationError("tender_id no puede estar vacío")
+
+        if self._last_tender is not None and self._last_tender[0] == tender_id_str:
+            return self._last_tender[1]
         
         try:
-            response = requests.get(f"https://www.contrataciones.gov.py/datos/api/v3/doc/tender/{tender_id_str}")
+            response = self.session.get(f"https://www.contrataciones.gov.py/datos/api/v3/doc/tender/{tender_id_str}", timeout=API_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
-            
+            # orjson parsea los bytes directamente, sin detectar la codificación del texto
+            data = orjson.loads(response.content)
+        except requests.exceptions.RequestException as e:
+            raise APIError(f"Error al consultar API para tender {tender_id_str}: {e}")
+        except ValueError as e:
+            raise APIError(f"Error al parsear respuesta JSON para tender {tender_id_str}: {e}")
+
+        self._last_tender = (tender_id_str, data)
+        return data
+
+    def get_document_list(self, tender_id: Union[str, int]) -> list[object]:
+        data = self.fetch_tender(tender_id)
+        tender_id_str = str(tender_id).strip()
+        
+        try:
             if "tender" not in data or "documents" not in data["tender"]:
                 raise APIError(f"Respuesta de API inválida para tender {tender_id_str}")
             
@@ -64,11 +267,7 @@ class TCSDownloader:
             
             return documents
             
-        except requests.exceptions.RequestException as e:
-            raise APIError(f"Error al consultar API para tender {tender_id_str}: {e}")
-        except ValueError as e:
-            raise APIError(f"Error al parsear respuesta JSON para tender {tender_id_str}: {e}")
-        except KeyError as e:
+        except (KeyError, TypeError) as e:
             raise APIError(f"Estructura de respuesta inesperada para tender {tender_id_str}: {e}")
 
     def select_document(self, document_list: list[object]) -> object:
@@ -77,8 +276,8 @@ class TCSDownloader:
         
         for document in document_list:
             try:
-                document_type = unidecode(document["documentTypeDetails"]).lower()
-                if document_type in ["pliego de bases y condiciones", "carta de invitacion"]:
+                document_type = _normalize(document["documentTypeDetails"])
+                if document_type in _VALID_DOCUMENT_TYPES:
                     return document
             except KeyError:
                 continue  # Si el documento no tiene documentTypeDetails, continuar
@@ -106,23 +305,7 @@ class TCSDownloader:
         Returns:
             bool: True si el documento es válido, False en caso contrario
         """
-        # Verificar tipo de documento por el nombre del archivo
-        filename_lower = unidecode(filename).lower()
-        is_pbc_or_invitation = (
-            "pliego" in filename_lower or 
-            "pbc" in filename_lower or
-            "carta" in filename_lower or
-            "invitacion" in filename_lower
-        )
-        
-        # Verificar formato por extensión
-        is_valid_format = (
-            filename.lower().endswith('.pdf') or
-            filename.lower().endswith('.doc') or
-            filename.lower().endswith('.docx')
-        )
-        
-        return is_pbc_or_invitation and is_valid_format
+        return _VALID_DOCUMENT_RE.match(_normalize(filename)) is not None
 
     def download_document_tmp(self, document: object) -> str:
         if not document:
@@ -135,14 +318,20 @@ class TCSDownloader:
             raise ValidationError("document debe tener un título")
         
         try:
-            tmpdir = tempfile.mkdtemp()
+            tmpdir = tempfile.mkdtemp(dir=self._tmp_root)
             path = os.path.join(tmpdir, document["title"])
             
-            response = requests.get(document["url"])
-            response.raise_for_status()
-            
-            with open(path, "wb") as f:
-                f.write(response.content)
+            # Descargar en streaming: la memoria usada no depende del tamaño del archivo
+            response = self.session.get(document["url"], stream=True, timeout=DOWNLOAD_TIMEOUT)
+            try:
+                response.raise_for_status()
+                
+                # iter_content decodifica gzip/deflate/br y funciona igual con sesiones cacheadas
+                with open(path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            finally:
+                response.close()
             
             if not os.path.exists(path) or os.path.getsize(path) == 0:
                 raise DownloadError(f"El archivo descargado está vacío: {document['title']}")
@@ -157,19 +346,8 @@ class TCSDownloader:
             raise DownloadError(f"Error inesperado al descargar {document['title']}: {e}")
 
     def check_document_mime_type(self, document: object) -> str:
-        name = document["title"]
-        if name.endswith(".pdf"):
-            return "application/pdf"
-        elif name.endswith(".doc"):
-            return "application/msword"
-        elif name.endswith(".docx"):
-            return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        elif name.endswith(".zip"):
-            return "application/zip"
-        elif name.endswith(".rar"):
-            return "application/x-rar-compressed"
-        else:
-            return ""
+        extension = os.path.splitext(document["title"])[1].lower()
+        return self._MIME_TYPES.get(extension, "")
 
     def extract_pbc_from_zip(self, zip_path: str) -> str:
         """
@@ -199,25 +377,24 @@ class TCSDownloader:
                 if not file_list:
                     raise ExtractionError(f"El archivo ZIP está vacío: {zip_path}")
                 
-                # Buscar el archivo válido usando is_valid_document
-                for filename in file_list:
-                    # Extraer solo el nombre del archivo (sin directorios)
-                    file_basename = os.path.basename(filename)
+                # Buscar el primer archivo válido usando is_valid_document (sobre el nombre sin directorios)
+                filename = next(
+                    (name for name in file_list if self.is_valid_document(os.path.basename(name))),
+                    None
+                )
+                
+                if filename is not None:
+                    # Copiar el miembro en bloques desde el ZIP ya abierto, sin cargarlo entero en memoria
+                    extracted_path = os.path.join(
+                        tempfile.mkdtemp(dir=self._tmp_root), os.path.basename(filename)
+                    )
+                    with zip_ref.open(filename) as src, open(extracted_path, "wb") as f:
+                        shutil.copyfileobj(src, f, length=DOWNLOAD_CHUNK_SIZE)
+                    
+                    if not os.path.exists(extracted_path):
+                        raise ExtractionError(f"Error al extraer {filename} del ZIP")
                     
-                    if self.is_valid_document(file_basename):
-                        # Crear directorio temporal
-                        tmpdir = tempfile.mkdtemp()
-                        
-                        # Extraer el archivo al directorio temporal
-                        zip_ref.extract(filename, tmpdir)
-                        
-                        # Construir el path completo del archivo extraído
-                        extracted_path = os.path.join(tmpdir, filename)
-                        
-                        if not os.path.exists(extracted_path):
-                            raise ExtractionError(f"Error al extraer {filename} del ZIP")
-                        
-                        return extracted_path
+                    return extracted_path
                 
                 # Si no se encontró ningún archivo válido
                 basenames = [os.path.basename(f) for f in file_list]
@@ -256,9 +433,6 @@ class TCSDownloader:
             raise ExtractionError(f"El archivo RAR no existe: {rar_path}")
         
         try:
-            # Configurar rarfile para usar unar en lugar de unrar
-            rarfile.UNRAR_TOOL = "unar"
-            
             with rarfile.RarFile(rar_path, 'r') as rar_ref:
                 # Listar archivos en el RAR
                 file_list = rar_ref.namelist()
@@ -266,25 +440,24 @@ class TCSDownloader:
                 if not file_list:
                     raise ExtractionError(f"El archivo RAR está vacío: {rar_path}")
                 
-                # Buscar el archivo válido usando is_valid_document
-                for filename in file_list:
-                    # Extraer solo el nombre del archivo (sin directorios)
-                    file_basename = os.path.basename(filename)
+                # Buscar el primer archivo válido usando is_valid_document (sobre el nombre sin directorios)
+                filename = next(
+                    (name for name in file_list if self.is_valid_document(os.path.basename(name))),
+                    None
+                )
+                
+                if filename is not None:
+                    # Copiar el miembro en bloques desde el RAR ya abierto, sin cargarlo entero en memoria
+                    extracted_path = os.path.join(
+                        tempfile.mkdtemp(dir=self._tmp_root), os.path.basename(filename)
+                    )
+                    with rar_ref.open(filename) as src, open(extracted_path, "wb") as f:
+                        shutil.copyfileobj(src, f, length=DOWNLOAD_CHUNK_SIZE)
+                    
+                    if not os.path.exists(extracted_path):
+                        raise ExtractionError(f"Error al extraer {filename} del RAR")
                     
-                    if self.is_valid_document(file_basename):
-                        # Crear directorio temporal
-                        tmpdir = tempfile.mkdtemp()
-                        
-                        # Extraer el archivo al directorio temporal
-                        rar_ref.extract(filename, tmpdir)
-                        
-                        # Construir el path completo del archivo extraído
-                        extracted_path = os.path.join(tmpdir, filename)
-                        
-                        if not os.path.exists(extracted_path):
-                            raise ExtractionError(f"Error al extraer {filename} del RAR")
-                        
-                        return extracted_path
+                    return extracted_path
                 
                 # Si no se encontró ningún archivo válido
                 basenames = [os.path.basename(f) for f in file_list]
@@ -331,7 +504,7 @@ class TCSDownloader:
             self._setup_conversion_environment()
             
             # Crear directorio temporal para el PDF
-            tmpdir = tempfile.mkdtemp()
+            tmpdir = tempfile.mkdtemp(dir=self._tmp_root)
             
             # Generar nombre del archivo PDF
             docx_filename = os.path.basename(docx_path)
@@ -339,18 +512,18 @@ class TCSDownloader:
             pdf_path = os.path.join(tmpdir, pdf_filename)
             
             # Intentar múltiples métodos de conversión
-            conversion_methods = [
-                ("pdflatex", lambda: pypandoc.convert_file(
-                    docx_path, 
-                    'pdf', 
-                    outputfile=pdf_path,
+            conversion_methods = []
+            if unoserver_available():
+                conversion_methods.append(
+                    ("unoserver", lambda: self._convert_via_unoserver(docx_path, pdf_path))
+                )
+            conversion_methods += [
+                ("pdflatex", lambda: self._convert_via_pandoc(
+                    docx_path,
+                    pdf_path,
                     extra_args=['--pdf-engine=pdflatex']
                 )),
-                ("pandoc default", lambda: pypandoc.convert_file(
-                    docx_path, 
-                    'pdf', 
-                    outputfile=pdf_path
-                )),
+                ("pandoc default", lambda: self._convert_via_pandoc(docx_path, pdf_path)),
                 ("via HTML", lambda: self._convert_via_html(docx_path, pdf_path)),
                 ("weasyprint", lambda: self._convert_via_weasyprint(docx_path, pdf_path))
             ]
@@ -395,10 +568,33 @@ class TCSDownloader:
                 os.environ['PATH'] = f"{latex_path}:{current_path}"
                 current_path = os.environ['PATH']
     
+    def _convert_via_unoserver(self, docx_path: str, pdf_path: str) -> None:
+        """
+        Método de conversión usando una instancia persistente de LibreOffice
+        """
+        start_unoserver()
+        subprocess.run(
+            ["unoconvert", "--port", str(UNOSERVER_PORT), docx_path, pdf_path],
+            check=True,
+            capture_output=True,
+            timeout=120
+        )
+
+    def _convert_via_pandoc(self, docx_path: str, pdf_path: str, extra_args: Optional[list] = None) -> None:
+        """
+        Método de conversión directa DOCX → PDF con pandoc
+        """
+        # Import diferido: pandoc solo hace falta cuando hay que convertir
+        import pypandoc
+
+        pypandoc.convert_file(docx_path, 'pdf', outputfile=pdf_path, extra_args=extra_args or ())
+
     def _convert_via_html(self, docx_path: str, pdf_path: str) -> None:
         """
         Método de conversión alternativo: DOCX → HTML → PDF
         """
+        import pypandoc
+
         # Crear archivo HTML temporal
         tmpdir = os.path.dirname(pdf_path)
         html_path = os.path.join(tmpdir, 'temp.html')
@@ -413,6 +609,8 @@ class TCSDownloader:
         """
         Método de conversión usando weasyprint: DOCX → HTML → PDF
         """
+        import pypandoc
+
         # Crear archivo HTML temporal
         tmpdir = os.path.dirname(pdf_path)
         html_path = os.path.join(tmpdir, 'temp.html')
@@ -427,7 +625,8 @@ class TCSDownloader:
         except ImportError:
             raise RuntimeError("weasyprint not available")
 
-    def process_tender_documents(self, tender_id: Union[str, int], output_directory: str) -> str:
+    def process_tender_documents(self, tender_id: Union[str, int], output_directory: str,
+                                 convert_to_pdf: bool = True) -> str:
         """
         Método facade que procesa completamente los documentos de una licitación.
         
@@ -443,11 +642,13 @@ class TCSDownloader:
         Args:
             tender_id: ID de la licitación (puede ser str o int)
             output_directory: Directorio donde guardar el documento final
+            convert_to_pdf: Si es False, los DOC/DOCX se guardan tal cual en lugar
+                de convertirse a PDF (útil cuando solo se necesita el texto)
             
         Returns:
-            str: Path del archivo PDF final, o cadena vacía si hay error
+            str: Path del archivo final (PDF, o DOC/DOCX si convert_to_pdf es False)
         """
-        temp_files = []  # Lista para rastrear archivos temporales
+        temp_dirs = set()  # Directorios temporales a eliminar al terminar
         
         try:
             # Validar y convertir tender_id
@@ -478,14 +679,15 @@ class TCSDownloader:
             
             # 3. Descargar el documento
             downloaded_path = self.download_document_tmp(selected_document)
-            temp_files.append(downloaded_path)
+            temp_dirs.add(os.path.dirname(downloaded_path))
             
             # 4. Procesar según el tipo de archivo
             final_pdf_path = self._process_downloaded_file(
                 downloaded_path, 
                 document_title, 
                 output_path,
-                temp_files
+                temp_dirs,
+                convert_to_pdf
             )
             
             return final_pdf_path
@@ -498,10 +700,11 @@ class TCSDownloader:
             
         finally:
             # 6. Limpiar archivos temporales
-            self._cleanup_temp_files(temp_files)
+            self._cleanup_temp_dirs(temp_dirs)
 
     def _process_downloaded_file(self, file_path: str, original_title: str, 
-                                output_path: Path, temp_files: list) -> str:
+                                output_path: Path, temp_dirs: set,
+                                convert_to_pdf: bool = True) -> str:
         """
         Procesa el archivo descargado según su tipo.
         
@@ -509,10 +712,11 @@ class TCSDownloader:
             file_path: Path del archivo descargado
             original_title: Título original del documento
             output_path: Directorio de salida
-            temp_files: Lista para rastrear archivos temporales
+            temp_dirs: Conjunto para rastrear directorios temporales
+            convert_to_pdf: Si es False, los DOC/DOCX se copian sin convertir
             
         Returns:
-            str: Path del archivo PDF final
+            str: Path del archivo final
         """
         # Determinar el tipo de archivo por extensión
         file_extension = Path(file_path).suffix.lower()
@@ -522,17 +726,21 @@ class TCSDownloader:
         if file_extension == '.pdf':
             # 4.1. Si es PDF, copiarlo directamente
             try:
-                shutil.copy2(file_path, final_pdf_path)
+                shutil.copyfile(file_path, final_pdf_path)
                 return str(final_pdf_path)
             except Exception as e:
                 raise TCSDownloaderError(f"Error al copiar PDF {file_path}: {e}")
             
         elif file_extension in ['.doc', '.docx']:
+            if not convert_to_pdf:
+                # 4.2. Si no se pide PDF, copiar el DOC/DOCX tal cual
+                return self._copy_document(file_path, output_path / f"{base_name}{file_extension}")
+            
             # 4.2. Si es DOC/DOCX, convertir a PDF
             converted_pdf = self.convert_docx_to_pdf(file_path)
-            temp_files.append(converted_pdf)
+            temp_dirs.add(os.path.dirname(converted_pdf))
             try:
-                shutil.copy2(converted_pdf, final_pdf_path)
+                shutil.copyfile(converted_pdf, final_pdf_path)
                 return str(final_pdf_path)
             except Exception as e:
                 raise TCSDownloaderError(f"Error al copiar PDF convertido {converted_pdf}: {e}")
@@ -540,20 +748,21 @@ class TCSDownloader:
         elif file_extension == '.zip':
             # 4.3. Si es ZIP, extraer y procesar
             return self._process_compressed_file(
-                file_path, 'zip', base_name, output_path, temp_files
+                file_path, 'zip', base_name, output_path, temp_dirs, convert_to_pdf
             )
             
         elif file_extension == '.rar':
             # 4.4. Si es RAR, extraer y procesar
             return self._process_compressed_file(
-                file_path, 'rar', base_name, output_path, temp_files
+                file_path, 'rar', base_name, output_path, temp_dirs, convert_to_pdf
             )
             
         else:
             raise ValidationError(f"Tipo de archivo no soportado: {file_extension}")
 
     def _process_compressed_file(self, compressed_path: str, file_type: str,
-                               base_name: str, output_path: Path, temp_files: list) -> str:
+                               base_name: str, output_path: Path, temp_dirs: set,
+                               convert_to_pdf: bool = True) -> str:
         """
         Procesa archivos comprimidos (ZIP/RAR).
         
@@ -562,10 +771,11 @@ class TCSDownloader:
             file_type: Tipo de archivo ('zip' o 'rar')
             base_name: Nombre base para el archivo final
             output_path: Directorio de salida
-            temp_files: Lista para rastrear archivos temporales
+            temp_dirs: Conjunto para rastrear directorios temporales
+            convert_to_pdf: Si es False, los DOC/DOCX se copian sin convertir
             
         Returns:
-            str: Path del archivo PDF final
+            str: Path del archivo final
         """
         # Extraer el archivo correcto del comprimido
         if file_type == 'zip':
@@ -575,57 +785,135 @@ class TCSDownloader:
         else:
             raise ValidationError(f"Tipo de archivo comprimido no soportado: {file_type}")
         
-        temp_files.append(extracted_path)
+        temp_dirs.add(os.path.dirname(extracted_path))
         extracted_extension = Path(extracted_path).suffix.lower()
         final_pdf_path = output_path / f"{base_name}.pdf"
         
         if extracted_extension == '.pdf':
             # Si el extraído es PDF, copiarlo directamente
             try:
-                shutil.copy2(extracted_path, final_pdf_path)
+                shutil.copyfile(extracted_path, final_pdf_path)
                 return str(final_pdf_path)
             except Exception as e:
                 raise TCSDownloaderError(f"Error al copiar PDF extraído {extracted_path}: {e}")
             
         elif extracted_extension in ['.doc', '.docx']:
+            if not convert_to_pdf:
+                # Si no se pide PDF, copiar el DOC/DOCX extraído tal cual
+                return self._copy_document(extracted_path, output_path / f"{base_name}{extracted_extension}")
+            
             # Si el extraído es DOC/DOCX, convertir a PDF
             converted_pdf = self.convert_docx_to_pdf(extracted_path)
-            temp_files.append(converted_pdf)
+            temp_dirs.add(os.path.dirname(converted_pdf))
             try:
-                shutil.copy2(converted_pdf, final_pdf_path)
+                shutil.copyfile(converted_pdf, final_pdf_path)
                 return str(final_pdf_path)
             except Exception as e:
                 raise TCSDownloaderError(f"Error al copiar PDF convertido {converted_pdf}: {e}")
         else:
             raise ValidationError(f"El documento extraído no es un formato válido: {extracted_extension}")
 
-    def _cleanup_temp_files(self, temp_files: list) -> None:
+    def _copy_document(self, source_path: str, destination_path: Path) -> str:
+        """
+        Copia el documento sin convertir al directorio de salida.
+        """
+        try:
+            shutil.copyfile(source_path, destination_path)
+            return str(destination_path)
+        except Exception as e:
+            raise TCSDownloaderError(f"Error al copiar documento {source_path}: {e}")
+
+    def extract_text(self, document_path: str,
+                     pdf_to_markdown: Optional[Callable[[str], str]] = None) -> str:
         """
-        Limpia todos los archivos y directorios temporales.
+        Extrae el texto de un documento en formato markdown.
+
+        Los DOCX se leen directamente con python-docx, sin pasar por PDF ni
+        lanzar procesos externos. Los PDF se leen con PDFReader y los DOC
+        (formato binario que python-docx no soporta) se convierten primero a PDF.
         
         Args:
-            temp_files: Lista de paths de archivos temporales
-        """
-        if not temp_files:
-            return
+            document_path: Path del documento (PDF, DOC o DOCX)
+            pdf_to_markdown: Función que recibe el path de un PDF y devuelve su
+                markdown, p. ej. para parsearlo en un pool de procesos propio.
+                Por defecto se usa PDFReader en el proceso actual
+            
+        Returns:
+            str: Texto del documento en markdown
             
-        for temp_file in temp_files:
+        Raises:
+            ValidationError: Si el formato no es soportado
+            ConversionError: Si no se puede extraer el texto
+        """
+        if not document_path:
+            raise ValidationError("document_path no puede estar vacío")
+        
+        if not os.path.exists(document_path):
+            raise ConversionError(f"El documento no existe: {document_path}")
+        
+        extension = Path(document_path).suffix.lower()
+        if extension not in _VALID_EXTENSIONS:
+            raise ValidationError(f"Tipo de archivo no soportado: {extension}")
+        
+        if extension == '.docx':
             try:
-                if os.path.exists(temp_file):
-                    if os.path.isfile(temp_file):
-                        os.remove(temp_file)
-                    elif os.path.isdir(temp_file):
-                        shutil.rmtree(temp_file)
-                        
-                    # También limpiar el directorio padre si está vacío y es temporal
-                    parent_dir = os.path.dirname(temp_file)
-                    if parent_dir and '/tmp' in parent_dir and os.path.exists(parent_dir):
-                        try:
-                            if not os.listdir(parent_dir):  # Si está vacío
-                                os.rmdir(parent_dir)
-                        except OSError:
-                            pass  # No pasa nada si no se puede eliminar
-                            
-            except OSError as e:
-                pass  # Ignorar errores de limpieza
+                return self._docx_to_markdown(document_path)
+            except Exception as e:
+                raise ConversionError(f"Error al extraer texto de {document_path}: {e}")
+        
+        if pdf_to_markdown is None:
+            pdf_to_markdown = _read_pdf_as_markdown
+        
+        pdf_path = document_path
+        converted_pdf = None
+        if extension == '.doc':
+            converted_pdf = pdf_path = self.convert_docx_to_pdf(document_path)
+        
+        try:
+            return pdf_to_markdown(pdf_path)
+        except Exception as e:
+            raise ConversionError(f"Error al extraer texto de {document_path}: {e}")
+        finally:
+            if converted_pdf:
+                self._cleanup_temp_dirs({os.path.dirname(converted_pdf)})
+
+    def _docx_to_markdown(self, docx_path: str) -> str:
+        """
+        Convierte un DOCX a markdown en orden de aparición: párrafos como texto
+        y tablas como tablas markdown (la primera fila es el encabezado).
+        """
+        from docx import Document
+        from docx.text.paragraph import Paragraph
+        
+        parts = []
+        for block in Document(docx_path).iter_inner_content():
+            if isinstance(block, Paragraph):
+                if block.text.strip():
+                    parts.append(block.text)
+                continue
+            
+            rows = [
+                [cell.text.strip().replace("\n", "<br>").replace("|", "\\|") for cell in row.cells]
+                for row in block.rows
+            ]
+            if not rows:
+                continue
+            rows.insert(1, ["---"] * len(rows[0]))
+            parts.append("\n".join("| " + " | ".join(row) + " |" for row in rows))
+        
+        return "\n\n".join(parts) + "\n"
 
+    def _cleanup_temp_dirs(self, temp_dirs: set) -> None:
+        """
+        Elimina los directorios temporales usados al procesar una licitación.
+        
+        Cada descarga, extracción o conversión escribe en su propio subdirectorio
+        de self._tmp_root, por lo que basta un rmtree por directorio.
+        
+        Args:
+            temp_dirs: Conjunto de directorios temporales
+        """
+        for temp_dir in temp_dirs:
+            # Solo se borran subdirectorios propios, nunca la raíz ni rutas externas
+            if temp_dir and os.path.dirname(temp_dir) == self._tmp_root:
+                shutil.rmtree(temp_dir, ignore_errors=True)
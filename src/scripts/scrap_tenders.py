@@ -1,118 +1,359 @@
+"""
+Download the PBC of every tender listed in data/ids.txt and extract its text.
+
+Run it as `scrap-tenders` from the repository root after `pip install -e .`:
+all data paths below are relative to the working directory.
+"""
 from pathlib import Path
-import requests
+import argparse
+import asyncio
+import csv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import signal
 import sys
 import os
 import json
-import pandas as pd
-
-src_dir = Path(__file__).parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
+import multiprocessing
+import threading
 
 from modules.pdf_reader import PDFReader
-from modules.tcs_downloader import TCSDownloader
+from modules.tcs_downloader import TCSDownloader, create_session
 
+IDS_FILE = "./data/ids.txt"
 CHECKPOINT_FILE = "./data/checkpoint.json"
 DATASET_FILE = "./data/dataset.csv"
+HTTP_CACHE_FILE = "./data/http_cache.sqlite"
+EXTRACTED_DIR = "./data/pbcs_extracted"
+DATASET_HEADER = ["Id llamado", "Cantidad de oferentes"]
+
+# Maximum number of tenders processed at the same time (one executor thread each)
+MAX_CONCURRENT_TENDERS = 16
+# Number of checkpoint updates between writes to disk
+CHECKPOINT_FLUSH_INTERVAL = 25
+
+_dirty_count = 0
+# dataset.csv is opened once per run; rows are appended from executor threads
+_dataset_file = None
+_dataset_writer = None
+_dataset_lock = threading.Lock()
 
-def load_checkpoint():
+# One TCSDownloader per executor thread: it keeps its own state (last fetched
+# tender, temp directory), so it is not shared between threads
+_thread_local = threading.local()
+
+def get_downloader(session):
+    """Return this thread's TCSDownloader, creating it on first use with the shared session."""
+    downloader = getattr(_thread_local, "downloader", None)
+    if downloader is None:
+        downloader = _thread_local.downloader = TCSDownloader(session=session)
+    return downloader
+
+def load_checkpoint(checkpoint_file=CHECKPOINT_FILE):
     """Load checkpoint with processed IDs and failed IDs."""
-    if os.path.exists(CHECKPOINT_FILE):
-        with open(CHECKPOINT_FILE, "r") as f:
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, "r") as f:
             return json.load(f)
     return {"processed": [], "failed": []}
 
-def save_checkpoint(checkpoint):
-    """Save checkpoint to file."""
-    with open(CHECKPOINT_FILE, "w") as f:
+def save_checkpoint(checkpoint, checkpoint_file=CHECKPOINT_FILE):
+    """Save checkpoint to file atomically."""
+    tmp_path = checkpoint_file + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, checkpoint_file)
+
+def mark_checkpoint_dirty(checkpoint, checkpoint_file=CHECKPOINT_FILE):
+    """Record a checkpoint update, flushing it only every CHECKPOINT_FLUSH_INTERVAL updates."""
+    global _dirty_count
+    _dirty_count += 1
+    if _dirty_count % CHECKPOINT_FLUSH_INTERVAL == 0:
+        save_checkpoint(checkpoint, checkpoint_file)
+
+def load_dataset_ids(dataset_file=DATASET_FILE):
+    """Return the IDs that already have a row in the dataset CSV."""
+    if not os.path.exists(dataset_file):
+        return set()
+    with open(dataset_file, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return {row[0] for row in reader if row}
+
+def open_dataset(dataset_file=DATASET_FILE):
+    """Open the dataset CSV for appending once per run, writing the header if it is new."""
+    global _dataset_file, _dataset_writer
+    new_file = not os.path.exists(dataset_file) or os.path.getsize(dataset_file) == 0
+    # Line buffering: each row reaches disk before it is marked in the checkpoint
+    _dataset_file = open(dataset_file, "a", newline="", buffering=1)
+    _dataset_writer = csv.writer(_dataset_file, lineterminator="\n")
+    if new_file:
+        _dataset_writer.writerow(DATASET_HEADER)
+
+def close_dataset():
+    """Close the dataset CSV opened by open_dataset."""
+    global _dataset_file, _dataset_writer
+    if _dataset_file is not None:
+        _dataset_file.close()
+    _dataset_file = _dataset_writer = None
 
 def append_to_dataset(tender_id, tenderers_number):
     """Append a single record to the dataset CSV."""
-    new_row = pd.DataFrame({"Id llamado": [tender_id], "Cantidad de oferentes": [tenderers_number]})
-    
-    if os.path.exists(DATASET_FILE):
-        existing_df = pd.read_csv(DATASET_FILE)
-        df = pd.concat([existing_df, new_row], ignore_index=True)
-    else:
-        df = new_row
-    
-    df.to_csv(DATASET_FILE, index=False)
+    with _dataset_lock:
+        _dataset_writer.writerow([tender_id, tenderers_number])
+
+def save_tender_output(tender_id, text_pbc, tenderers_number):
+    """Save the extracted text and the dataset row (blocking, runs in an executor)."""
+    Path(EXTRACTED_DIR, f"{tender_id}.txt").write_text(text_pbc, encoding="utf-8")
+    append_to_dataset(tender_id, tenderers_number)
 
-def get_tenderers_number(tender_id):
+def get_tenderers_number(tender):
+    """Read the number of tenderers from the already fetched tender JSON."""
     try:
-        response = requests.get(f"https://www.contrataciones.gov.py/datos/api/v3/doc/tender/{tender_id}")
-        tender = response.json()
         return int(tender["tender"]["numberOfTenderers"])
     except Exception as e:
         print("No se pudo obtener la cantidad de oferentes")
         raise e
 
-def download_pbc(tender_id):
+def download_pbc(downloader, tender_id):
     try:
-        downloader = TCSDownloader()
-        return downloader.process_tender_documents(tender_id, "./tmp")
+        # One directory per tender: concurrent downloads may share a file name.
+        # Only the text is needed, so DOCX files are not converted to PDF.
+        return downloader.process_tender_documents(tender_id, f"./tmp/{tender_id}", convert_to_pdf=False)
     except Exception as e:
         print("No se pudo obtener el pbc")
         raise e
 
 
-def extract_pbc_text(tender_file):
+def extract_pdf_markdown(pdf_path):
+    """Extract a PDF as markdown inside a pool process (without a sub-pool of its own)."""
+    return PDFReader(pdf_path, max_workers=1).read_pdf_as_markdown()
+
+def extract_pbc_text(downloader, pdf_pool, tender_file):
     try:
-        reader = PDFReader(tender_file)
-        return reader.read_pdf_as_markdown()
+        # PDFs (including the ones converted from DOC) are parsed in the process pool
+        return downloader.extract_text(
+            tender_file,
+            pdf_to_markdown=lambda pdf_path: pdf_pool.submit(extract_pdf_markdown, pdf_path).result(),
+        )
     except Exception as e:
         print("No se pudo extraer el texto del pbc")
         raise e
 
-def scrap_pbcs(ids):
-    checkpoint = load_checkpoint()
+def download_and_extract_pbc(session, pdf_pool, tender_id):
+    """
+    Download the PBC and extract its text along with the number of tenderers
+    (blocking, runs in an executor).
+
+    The tender JSON is fetched only once: the downloader caches it and the
+    number of tenderers is read from it as well.
+    """
+    downloader = get_downloader(session)
+    filename = download_pbc(downloader, tender_id)
+    tenderers_number = get_tenderers_number(downloader.fetch_tender(tender_id))
+    return extract_pbc_text(downloader, pdf_pool, filename), tenderers_number
+
+async def process_tender(session, pdf_pool, tender_id, position, total, checkpoint, failed_ids, checkpoint_file):
+    print(f"Extrayendo licitación {position} de {total}, con id {tender_id}")
+    loop = asyncio.get_running_loop()
+    try:
+        text_pbc, tenderers_number = await loop.run_in_executor(
+            None, download_and_extract_pbc, session, pdf_pool, tender_id
+        )
+        
+        # Save extracted text and append to dataset, off the event loop
+        await loop.run_in_executor(None, save_tender_output, tender_id, text_pbc, tenderers_number)
+        
+        # Update checkpoint as processed
+        checkpoint["processed"].append(tender_id)
+        if tender_id in failed_ids:
+            checkpoint["failed"].remove(tender_id)
+        mark_checkpoint_dirty(checkpoint, checkpoint_file)
+        
+        print(f"Extraido y guardado: {tender_id}")
+        
+    except Exception as e:
+        print(f"Error procesando {tender_id}: {e}")
+        if tender_id not in failed_ids:
+            checkpoint["failed"].append(tender_id)
+            mark_checkpoint_dirty(checkpoint, checkpoint_file)
+
+async def tender_worker(session, pdf_pool, queue, total, checkpoint, failed_ids, checkpoint_file):
+    """Take tenders from the queue until it is empty."""
+    while True:
+        try:
+            position, tender_id = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        await process_tender(session, pdf_pool, tender_id, position, total, checkpoint, failed_ids, checkpoint_file)
+
+async def scrap_pending(session, pending_ids, checkpoint, failed_ids, checkpoint_file,
+                        workers=MAX_CONCURRENT_TENDERS):
+    """Process the pending tenders concurrently."""
+    # The default executor (min(32, cpu + 4) threads) may be smaller than the number
+    # of workers; each tender blocks a thread while it downloads and extracts.
+    # asyncio.run shuts it down when done.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tender")
+    )
+    
+    # A fixed number of workers drains the queue instead of one task per tender
+    queue = asyncio.Queue()
+    for idx, id in enumerate(pending_ids):
+        queue.put_nowait((idx + 1, id))
+    
+    # PDFs are parsed in parallel processes; spawn avoids forking a threaded process
+    pdf_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        await asyncio.gather(
+            *(
+                tender_worker(session, pdf_pool, queue, len(pending_ids), checkpoint, failed_ids, checkpoint_file)
+                for _ in range(min(workers, len(pending_ids)))
+            )
+        )
+    finally:
+        pdf_pool.shutdown(cancel_futures=True)
+
+def scrap_pbcs(ids, workers=MAX_CONCURRENT_TENDERS, checkpoint_file=CHECKPOINT_FILE, dataset_file=DATASET_FILE):
+    # Create the output directory once, before processing
+    Path(EXTRACTED_DIR).mkdir(parents=True, exist_ok=True)
+    
+    checkpoint = load_checkpoint(checkpoint_file)
     processed_ids = set(checkpoint["processed"])
     failed_ids = set(checkpoint["failed"])
     
+    # Tenders with extracted text and a dataset row (e.g. from a run whose checkpoint
+    # was lost) count as processed and are not downloaded again
+    dataset_ids = load_dataset_ids(dataset_file)
+    for id in ids:
+        if id not in processed_ids and id in dataset_ids and Path(EXTRACTED_DIR, f"{id}.txt").exists():
+            checkpoint["processed"].append(id)
+            processed_ids.add(id)
+            if id in failed_ids:
+                checkpoint["failed"].remove(id)
+                failed_ids.discard(id)
+    
     # Filter out already processed IDs
     pending_ids = [id for id in ids if id not in processed_ids]
     
     if len(pending_ids) < len(ids):
         print(f"Resumiendo desde checkpoint: {len(processed_ids)} ya procesados, {len(pending_ids)} pendientes")
     
-    for idx, id in enumerate(pending_ids):
-        print(f"Extrayendo licitación {idx + 1} de {len(pending_ids)}, con id {id}")
-        try:
-            filename = download_pbc(id)
-            text_pbc = extract_pbc_text(filename)
-            tenderers_number = get_tenderers_number(id)
-            
-            # Save extracted text
-            output_path = f"./data/pbcs_extracted/{id}.txt"
-            with open(output_path, "w+") as output:
-                output.write(text_pbc)
-            
-            # Append to dataset immediately
-            append_to_dataset(id, tenderers_number)
-            
-            # Update checkpoint as processed
-            checkpoint["processed"].append(id)
-            if id in failed_ids:
-                checkpoint["failed"].remove(id)
-            save_checkpoint(checkpoint)
-            
-            print(f"Extraido y guardado: {id}")
-            
-        except KeyboardInterrupt:
-            print("\nInterrupción detectada. Progreso guardado en checkpoint.")
-            save_checkpoint(checkpoint)
-            sys.exit(0)
-        except Exception as e:
-            print(f"Error procesando {id}: {e}")
-            if id not in failed_ids:
-                checkpoint["failed"].append(id)
-                save_checkpoint(checkpoint)
-            continue
+    # The checkpoint is saved in batches: turn SIGTERM into SystemExit so the finally
+    # below flushes it. Signal handlers can only be set from the main thread.
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    if in_main_thread:
+        previous_sigterm = signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    
+    # Shared session: reuses API connections across tenders and caches the
+    # responses on disk for retries and re-runs. Created here rather than at
+    # import so that importing the module doesn't create the cache file
+    session = create_session(cache_path=HTTP_CACHE_FILE)
+    open_dataset(dataset_file)
+    try:
+        asyncio.run(scrap_pending(session, pending_ids, checkpoint, failed_ids, checkpoint_file, workers))
+    except KeyboardInterrupt:
+        print("\nInterrupción detectada. Progreso guardado en checkpoint.")
+        sys.exit(0)
+    finally:
+        close_dataset()
+        session.close()
+        save_checkpoint(checkpoint, checkpoint_file)
+        if in_main_thread:
+            # Restore the caller's handler (None means it was not set from Python)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL if previous_sigterm is None else previous_sigterm)
     
     print(f"\nProceso completado. Total procesados: {len(checkpoint['processed'])}, Fallidos: {len(checkpoint['failed'])}")
 
+def shard_path(path, shard_index):
+    """Return the per-shard variant of a data file, e.g. dataset.csv -> dataset.shard0.csv."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard_index}{ext}"
+
+def merge_shards(num_shards, checkpoint_file=CHECKPOINT_FILE, dataset_file=DATASET_FILE):
+    """
+    Merge the per-shard datasets and checkpoints into the main files.
+
+    Rows already in the main dataset are kept and each ID appears only once,
+    so merging again after resuming a shard is safe. The shard files are left
+    in place.
+    """
+    checkpoint = load_checkpoint(checkpoint_file)
+    rows = {}
+    for path in [dataset_file] + [shard_path(dataset_file, i) for i in range(num_shards)]:
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if row:
+                    rows.setdefault(row[0], row)
+
+    for i in range(num_shards):
+        shard_checkpoint_file = shard_path(checkpoint_file, i)
+        if not os.path.exists(shard_checkpoint_file):
+            print(f"No se encontró el checkpoint de la partición {i}: {shard_checkpoint_file}")
+            continue
+        shard_checkpoint = load_checkpoint(shard_checkpoint_file)
+        checkpoint["processed"].extend(shard_checkpoint["processed"])
+        checkpoint["failed"].extend(shard_checkpoint["failed"])
+
+    processed = list(dict.fromkeys(checkpoint["processed"]))
+    processed_ids = set(processed)
+    checkpoint = {
+        "processed": processed,
+        "failed": [id for id in dict.fromkeys(checkpoint["failed"]) if id not in processed_ids],
+    }
+
+    tmp_path = dataset_file + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(DATASET_HEADER)
+        writer.writerows(sorted(rows.values(), key=lambda row: (len(row[0]), row[0])))
+    os.replace(tmp_path, dataset_file)
+    save_checkpoint(checkpoint, checkpoint_file)
+    print(f"Particiones combinadas: {len(rows)} filas en {dataset_file}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Descarga los PBC de las licitaciones listadas en ids.txt")
+    parser.add_argument("--start", type=int, default=None, help="Índice inicial (inclusive) de los IDs a procesar")
+    parser.add_argument("--end", type=int, default=None, help="Índice final (exclusivo) de los IDs a procesar")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_TENDERS,
+                        help="Licitaciones procesándose al mismo tiempo")
+    parser.add_argument("--num-shards", type=int, default=1,
+                        help="Cantidad de particiones en que se reparte la lista (p. ej. entre máquinas)")
+    parser.add_argument("--shard-index", type=int, default=0, help="Partición a procesar (0 .. num-shards - 1)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Combina los dataset y checkpoint de las --num-shards particiones en dataset.csv "
+                             "y checkpoint.json, sin descargar nada")
+    args = parser.parse_args(argv)
+    if args.num_shards < 1 or not 0 <= args.shard_index < args.num_shards:
+        parser.error("--shard-index debe estar entre 0 y --num-shards - 1")
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.merge:
+        merge_shards(args.num_shards)
+        return
+    
+    raw_ids = Path(IDS_FILE).read_text().split()
+    # Deduplicated and in numeric order: consecutive IDs make better use of the server cache
+    ids = sorted(set(raw_ids), key=lambda id: (len(id), id))
+    print(f"IDs leídos: {len(raw_ids)}, únicos: {len(ids)} ({len(raw_ids) - len(ids)} duplicados descartados)")
+    
+    ids = ids[args.start:args.end][args.shard_index::args.num_shards]
+    checkpoint_file, dataset_file = CHECKPOINT_FILE, DATASET_FILE
+    if args.num_shards > 1:
+        # Each shard keeps its own checkpoint and dataset so shards can run in parallel;
+        # combine them afterwards with --merge
+        checkpoint_file = shard_path(CHECKPOINT_FILE, args.shard_index)
+        dataset_file = shard_path(DATASET_FILE, args.shard_index)
+    
+    scrap_pbcs(ids, workers=args.workers, checkpoint_file=checkpoint_file, dataset_file=dataset_file)
+
 if __name__ == "__main__":
-    ids_file = open("./data/ids.txt")
-    ids = ids_file.read().split(" ")
-    scrap_pbcs(ids)
\ No newline at end of file
+    main()
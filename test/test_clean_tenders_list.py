@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests para la escritura del CSV de licitaciones filtradas
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clean_tenders_list import write_csv
+
+
+class TestWriteCSV:
+    """Test suite para write_csv"""
+
+    @pytest.fixture
+    def tenders_df(self):
+        """Fixture con licitaciones de ejemplo con fechas, booleanos, decimales y textos"""
+        return pd.DataFrame({
+            "ID licitación": [1, 2, 3],
+            "Fecha": pd.to_datetime(["2024-01-01", "2024-02-03", None]),
+            "Adjudicada": [True, False, True],
+            "Monto": [2000.0, np.nan, 0.1],
+            "Nombre": ["Ruta 1, tramo A", 'Puente "Sur"', None],
+        })
+
+    def test_write_csv_expected_text(self, tenders_df, tmp_path):
+        """Test que el CSV escrito tenga el formato de valores de DataFrame.to_csv"""
+        output_path = tmp_path / "licitaciones.csv"
+        write_csv(tenders_df, output_path)
+
+        assert output_path.read_text(encoding="utf-8") == (
+            'ID licitación,Fecha,Adjudicada,Monto,Nombre\n'
+            '1,"2024-01-01","True","2000.0","Ruta 1, tramo A"\n'
+            '2,"2024-02-03","False",,"Puente ""Sur"""\n'
+            '3,,"True","0.1",\n'
+        )
+
+    def test_write_csv_reads_back_like_pandas(self, tenders_df, tmp_path):
+        """Test que el CSV escrito se lea igual que el generado por DataFrame.to_csv"""
+        output_path = tmp_path / "licitaciones.csv"
+        write_csv(tenders_df, output_path)
+
+        expected = pd.read_csv(io.StringIO(tenders_df.to_csv(index=False)))
+        pd.testing.assert_frame_equal(pd.read_csv(output_path), expected)
+
+    def test_write_csv_mixed_types_fallback(self, tmp_path):
+        """Test que las columnas con tipos mezclados se escriban con pandas"""
+        df = pd.DataFrame({"ID licitación": [1, 2], "Valor": [1, "a"]})
+        output_path = tmp_path / "licitaciones.csv"
+        write_csv(df, output_path)
+
+        assert output_path.read_text(encoding="utf-8") == df.to_csv(index=False)
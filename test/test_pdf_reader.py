@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests para la clase PDFReader
+"""
+
+from pathlib import Path
+
+import pytest
+
+from modules.pdf_reader import PDFReader
+
+
+# Páginas del fixture con una tabla con bordes: la última del primer bloque de 3 páginas,
+# la primera del segundo y la única del último bloque
+TABLE_PAGES = {3, 4, 7}
+
+
+@pytest.fixture(scope="module")
+def pdf_path():
+    """Fixture con un PDF de 7 páginas ("Pagina N del pliego") con tablas en TABLE_PAGES"""
+    return str(Path(__file__).parent / "fixtures" / "pliego_paginas.pdf")
+
+
+@pytest.fixture(scope="module")
+def sequential_pages(pdf_path):
+    """Fixture con las páginas leídas en un solo proceso y un solo bloque"""
+    return PDFReader(pdf_path, max_workers=1).read_pdf()
+
+
+class TestPDFReader:
+    """Test suite para la clase PDFReader"""
+
+    def test_read_pdf_pages_in_order(self, sequential_pages):
+        """Test que las páginas se devuelven en orden, numeradas desde 1, con sus tablas"""
+        assert [page["page"] for page in sequential_pages] == list(range(1, 8))
+        for page in sequential_pages:
+            number = page["page"]
+            assert page["text_content"].startswith(f"Pagina {number} del pliego")
+            if number in TABLE_PAGES:
+                assert page["lattice_tables"] == [[["Item", "Monto"], [f"Tramo {number}", f"{number}000"]]]
+            else:
+                assert page["lattice_tables"] == []
+
+    def test_iter_page_chunks_sizes(self, pdf_path):
+        """Test que el PDF se lee en bloques de chunk_size páginas"""
+        chunks = list(PDFReader(pdf_path, max_workers=1, chunk_size=3).iter_page_chunks())
+
+        assert [[page["page"] for page in chunk] for chunk in chunks] == [[1, 2, 3], [4, 5, 6], [7]]
+
+    @pytest.mark.parametrize("max_workers,chunk_size", [(3, 3), (2, 3), (3, 50), (4, 2)])
+    def test_read_pdf_parallel_matches_sequential(self, pdf_path, sequential_pages, max_workers, chunk_size):
+        """Test que leer con varios procesos y bloques da el mismo resultado que con uno solo"""
+        pages = PDFReader(pdf_path, max_workers=max_workers, chunk_size=chunk_size).read_pdf()
+
+        assert pages == sequential_pages
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests para el script de descarga de PBCs (scrap_tenders)
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+import scripts.scrap_tenders as scrap_tenders
+
+
+class TestScrapTenders:
+    """Test suite para scrap_tenders"""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        """Fixture que ejecuta cada test en un directorio con su propio ./data"""
+        monkeypatch.chdir(tmp_path)
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        monkeypatch.setattr(scrap_tenders, "_dirty_count", 0)
+        return data_dir
+
+    @pytest.fixture
+    def run_env(self, data_dir):
+        """Fixture que evita la sesión HTTP real"""
+        with patch.object(scrap_tenders, "create_session", return_value=Mock()):
+            yield data_dir
+
+    @staticmethod
+    def fake_download_and_extract(failing_ids=()):
+        """Reemplazo de download_and_extract_pbc que falla para los IDs indicados"""
+        def download_and_extract_pbc(session, pdf_pool, tender_id):
+            if tender_id in failing_ids:
+                raise RuntimeError("sin pbc")
+            return f"texto {tender_id}", 3
+        return Mock(side_effect=download_and_extract_pbc)
+
+    @staticmethod
+    def read_dataset(path):
+        """Lee las filas (sin encabezado) del dataset"""
+        return path.read_text(encoding="utf-8").splitlines()[1:]
+
+    def test_scrap_pbcs_writes_rows_and_checkpoint(self, run_env):
+        """Test que scrap_pbcs guarda texto, filas del dataset y checkpoint"""
+        checkpoint_file = run_env / "checkpoint.json"
+        dataset_file = run_env / "dataset.csv"
+        fake = self.fake_download_and_extract(failing_ids={"3"})
+
+        with patch.object(scrap_tenders, "download_and_extract_pbc", fake):
+            scrap_tenders.scrap_pbcs(
+                ["1", "2", "3"], workers=2,
+                checkpoint_file=str(checkpoint_file), dataset_file=str(dataset_file)
+            )
+
+        assert sorted(self.read_dataset(dataset_file)) == ["1,3", "2,3"]
+        assert (run_env / "pbcs_extracted" / "1.txt").read_text(encoding="utf-8") == "texto 1"
+        checkpoint = json.loads(checkpoint_file.read_text())
+        assert sorted(checkpoint["processed"]) == ["1", "2"]
+        assert checkpoint["failed"] == ["3"]
+        assert not Path(str(checkpoint_file) + ".tmp").exists()
+
+    def test_scrap_pbcs_rerun_skips_extracted_ids(self, run_env):
+        """Test que una nueva corrida sin checkpoint no vuelve a descargar IDs con .txt y fila en el dataset"""
+        checkpoint_file = run_env / "checkpoint.json"
+        dataset_file = run_env / "dataset.csv"
+        kwargs = {"checkpoint_file": str(checkpoint_file), "dataset_file": str(dataset_file)}
+
+        with patch.object(scrap_tenders, "download_and_extract_pbc",
+                          self.fake_download_and_extract(failing_ids={"3"})):
+            scrap_tenders.scrap_pbcs(["1", "2", "3"], **kwargs)
+
+        # Checkpoint perdido y un .txt sin fila en el dataset: solo "1" cuenta como extraído
+        checkpoint_file.unlink()
+        (run_env / "pbcs_extracted" / "2.txt").unlink()
+        (run_env / "pbcs_extracted" / "4.txt").write_text("texto 4", encoding="utf-8")
+
+        fake = self.fake_download_and_extract()
+        with patch.object(scrap_tenders, "download_and_extract_pbc", fake):
+            scrap_tenders.scrap_pbcs(["1", "2", "3", "4"], **kwargs)
+
+        assert sorted(call.args[2] for call in fake.call_args_list) == ["2", "3", "4"]
+        checkpoint = json.loads(checkpoint_file.read_text())
+        assert sorted(checkpoint["processed"]) == ["1", "2", "3", "4"]
+        assert checkpoint["failed"] == []
+
+    def test_scrap_pbcs_twice_in_one_process(self, data_dir):
+        """Test que dos corridas en el mismo proceso dejan el checkpoint de la última al salir"""
+        script = textwrap.dedent("""
+            from unittest.mock import Mock, patch
+            import scripts.scrap_tenders as scrap_tenders
+
+            def download_and_extract_pbc(session, pdf_pool, tender_id):
+                return f"texto {tender_id}", 3
+
+            with patch.object(scrap_tenders, "create_session", return_value=Mock()), \\
+                 patch.object(scrap_tenders, "download_and_extract_pbc", download_and_extract_pbc):
+                scrap_tenders.scrap_pbcs(["1"])
+                scrap_tenders.scrap_pbcs(["1", "2"])
+        """)
+        src_dir = Path(scrap_tenders.__file__).resolve().parents[1]
+        env = {**os.environ, "PYTHONPATH": str(src_dir)}
+        subprocess.run([sys.executable, "-c", script], cwd=data_dir.parent, env=env, check=True,
+                       capture_output=True)
+
+        checkpoint = json.loads((data_dir / "checkpoint.json").read_text())
+        assert checkpoint == {"processed": ["1", "2"], "failed": []}
+
+    def test_scrap_pbcs_restores_sigterm_handler(self, run_env):
+        """Test que scrap_pbcs restaura el handler de SIGTERM previo"""
+        previous = signal.getsignal(signal.SIGTERM)
+
+        with patch.object(scrap_tenders, "download_and_extract_pbc", self.fake_download_and_extract()):
+            scrap_tenders.scrap_pbcs(["1"])
+
+        assert signal.getsignal(signal.SIGTERM) is previous
+
+    def test_scrap_pbcs_outside_main_thread(self, run_env):
+        """Test que scrap_pbcs se puede ejecutar desde un hilo que no es el principal"""
+        errors = []
+
+        def run():
+            try:
+                scrap_tenders.scrap_pbcs(["1"])
+            except Exception as e:
+                errors.append(e)
+
+        with patch.object(scrap_tenders, "download_and_extract_pbc", self.fake_download_and_extract()):
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+
+        assert errors == []
+        assert self.read_dataset(run_env / "dataset.csv") == ["1,3"]
+
+    def test_mark_checkpoint_dirty_flushes_in_batches(self, data_dir):
+        """Test que el checkpoint se escribe cada CHECKPOINT_FLUSH_INTERVAL actualizaciones"""
+        checkpoint_file = data_dir / "checkpoint.json"
+        checkpoint = {"processed": [], "failed": []}
+
+        with patch.object(scrap_tenders, "CHECKPOINT_FLUSH_INTERVAL", 2):
+            checkpoint["processed"].append("1")
+            scrap_tenders.mark_checkpoint_dirty(checkpoint, str(checkpoint_file))
+            assert not checkpoint_file.exists()
+
+            checkpoint["processed"].append("2")
+            scrap_tenders.mark_checkpoint_dirty(checkpoint, str(checkpoint_file))
+
+        assert json.loads(checkpoint_file.read_text()) == {"processed": ["1", "2"], "failed": []}
+
+    def test_main_dedupes_sorts_and_shards_ids(self, data_dir):
+        """Test que main descarta duplicados, ordena numéricamente y usa archivos por partición"""
+        (data_dir / "ids.txt").write_text("10\n2\n3\n2\n11\n1\n")
+
+        with patch.object(scrap_tenders, "scrap_pbcs") as mock_scrap:
+            scrap_tenders.main(["--num-shards", "2", "--shard-index", "1", "--workers", "4"])
+
+        mock_scrap.assert_called_once_with(
+            ["2", "10"], workers=4,
+            checkpoint_file="./data/checkpoint.shard1.json", dataset_file="./data/dataset.shard1.csv"
+        )
+
+    def test_merge_shards(self, data_dir):
+        """Test que merge_shards combina los dataset y checkpoint de las particiones"""
+        header = "Id llamado,Cantidad de oferentes\n"
+        (data_dir / "dataset.shard0.csv").write_text(header + "1,3\n10,2\n")
+        (data_dir / "dataset.shard1.csv").write_text(header + "2,5\n")
+        (data_dir / "checkpoint.shard0.json").write_text(json.dumps({"processed": ["1", "10"], "failed": ["2"]}))
+        (data_dir / "checkpoint.shard1.json").write_text(json.dumps({"processed": ["2"], "failed": []}))
+
+        scrap_tenders.merge_shards(2)
+        scrap_tenders.merge_shards(2)
+
+        assert (data_dir / "dataset.csv").read_text() == header + "1,3\n2,5\n10,2\n"
+        checkpoint = json.loads((data_dir / "checkpoint.json").read_text())
+        assert checkpoint == {"processed": ["1", "10", "2"], "failed": []}
+
+    @pytest.mark.parametrize("argv", [
+        ["--num-shards", "2", "--shard-index", "2"],
+        ["--shard-index", "-1"],
+        ["--num-shards", "0"],
+        ["--workers", "0"],
+    ])
+    def test_parse_args_rejects_invalid_values(self, argv):
+        """Test que parse_args rechaza particiones y cantidades de workers inválidas"""
+        with pytest.raises(SystemExit):
+            scrap_tenders.parse_args(argv)
@@ -5,17 +5,23 @@ Tests para la clase TCSDownloader
 
 import pytest
 import os
+import sys
 import tempfile
 import json
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
-# Importar la clase a testear
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Importar la clase a testear (pytest agrega src/ al path, ver pythonpath en pytest.ini)
 from modules.tcs_downloader.tcs_downloader import TCSDownloader
 
 
+@pytest.fixture(scope="session")
+def fixture_bytes():
+    """Fixture con el contenido de los archivos de prueba, leídos una sola vez por sesión"""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    return {p.name: p.read_bytes() for p in fixtures_path.iterdir() if p.is_file()}
+
+
 class TestTCSDownloader:
     """Test suite para la clase TCSDownloader"""
     
@@ -57,20 +63,47 @@ class TestTCSDownloader:
             }
         }
 
+    # Tests para la sesión HTTP
+    def test_init_creates_pooled_session(self, downloader):
+        """Test que la sesión por defecto tiene pool de conexiones y reintentos"""
+        adapter = downloader.session.get_adapter("https://www.contrataciones.gov.py")
+        
+        assert adapter._pool_maxsize == 32
+        assert adapter.max_retries.total == 3
+        assert "gzip" in downloader.session.headers["Accept-Encoding"]
+    
+    def test_init_with_shared_session(self):
+        """Test que se reutiliza la sesión recibida"""
+        from modules.tcs_downloader.tcs_downloader import create_session
+        
+        session = create_session()
+        
+        assert TCSDownloader(session=session).session is session
+
+    def test_create_session_with_cache(self, tmp_path):
+        """Test sesión con caché en disco para la API"""
+        requests_cache = pytest.importorskip("requests_cache")
+        from modules.tcs_downloader.tcs_downloader import create_session
+
+        session = create_session(cache_path=str(tmp_path / "http_cache.sqlite"))
+
+        assert isinstance(session, requests_cache.CachedSession)
+        assert session.get_adapter("https://www.contrataciones.gov.py")._pool_maxsize == 32
+
     # Tests para get_document_list
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_document_list_success(self, mock_get, downloader, mock_api_response):
         """Test exitoso de get_document_list"""
-        mock_get.return_value.json.return_value = mock_api_response
+        mock_get.return_value.content = json.dumps(mock_api_response).encode()
         
         result = downloader.get_document_list("12345")
         
         assert len(result) == 3
         assert result[0]["title"] == "pliego_bases_condiciones.pdf"
         assert result[1]["title"] == "carta_invitacion.docx"
-        mock_get.assert_called_once_with("https://www.contrataciones.gov.py/datos/api/v3/doc/tender/12345")
+        mock_get.assert_called_once_with("https://www.contrataciones.gov.py/datos/api/v3/doc/tender/12345", timeout=(5, 30))
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_document_list_api_error(self, mock_get, downloader):
         """Test manejo de errores en get_document_list"""
         mock_get.side_effect = Exception("API Error")
@@ -78,17 +111,17 @@ class TestTCSDownloader:
         with pytest.raises(Exception):
             downloader.get_document_list("12345")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_document_list_with_integer(self, mock_get, downloader, mock_api_response):
         """Test con tender_id como entero"""
-        mock_get.return_value.json.return_value = mock_api_response
+        mock_get.return_value.content = json.dumps(mock_api_response).encode()
         
         result = downloader.get_document_list(12345)
         
         assert len(result) == 3
         assert result[0]["title"] == "pliego_bases_condiciones.pdf"
         # Verificar que se llamó con el ID convertido a string
-        mock_get.assert_called_with("https://www.contrataciones.gov.py/datos/api/v3/doc/tender/12345")
+        mock_get.assert_called_with("https://www.contrataciones.gov.py/datos/api/v3/doc/tender/12345", timeout=(5, 30))
     
     def test_get_document_list_validation_none(self, downloader):
         """Test validación con None"""
@@ -117,6 +150,18 @@ class TestTCSDownloader:
         
         assert "tender_id no puede estar vacío" in str(exc_info.value)
 
+    @patch('requests.Session.get')
+    def test_fetch_tender_reuses_last_response(self, mock_get, downloader, mock_api_response):
+        """Test que la lista de documentos y el JSON de la licitación comparten una sola consulta"""
+        mock_get.return_value.content = json.dumps(mock_api_response).encode()
+
+        documents = downloader.get_document_list("12345")
+        tender = downloader.fetch_tender(12345)
+
+        assert tender == mock_api_response
+        assert documents == mock_api_response["tender"]["documents"]
+        mock_get.assert_called_once()
+
     # Tests para select_document
     def test_select_document_pbc(self, downloader, mock_api_response):
         """Test selección de documento PBC"""
@@ -244,11 +289,11 @@ class TestTCSDownloader:
         assert downloader.check_document_mime_type(document) == ""
 
     # Tests para download_document_tmp
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_download_document_tmp_success(self, mock_get, downloader):
         """Test descarga exitosa de documento temporal"""
         mock_response = Mock()
-        mock_response.content = b"contenido del archivo"
+        mock_response.iter_content.return_value = [b"contenido del archivo"]
         mock_get.return_value = mock_response
         
         document = {
@@ -266,8 +311,11 @@ class TestTCSDownloader:
         with open(result, 'rb') as f:
             content = f.read()
             assert content == b"contenido del archivo"
+        
+        # Verificar que la descarga se hizo en streaming
+        mock_get.assert_called_once_with("https://example.com/doc.pdf", stream=True, timeout=(5, 120))
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_download_document_tmp_request_error(self, mock_get, downloader):
         """Test error en descarga de documento"""
         mock_get.side_effect = Exception("Network error")
@@ -356,6 +404,8 @@ class TestTCSDownloader:
     # Nota: Test completo de RAR requiere archivo RAR válido
 
     # Tests para convert_docx_to_pdf
+    @pytest.mark.slow
+    @pytest.mark.xdist_group("libreoffice")
     def test_convert_docx_to_pdf_success(self, downloader, fixtures_dir):
         """Test conversión exitosa de DOCX a PDF"""
         docx_path = fixtures_dir / "pliego_bases_condiciones.docx"
@@ -376,6 +426,8 @@ class TestTCSDownloader:
         
         assert "El archivo DOCX no existe" in str(exc_info.value)
     
+    @pytest.mark.slow
+    @pytest.mark.xdist_group("libreoffice")
     def test_convert_docx_to_pdf_carta(self, downloader, fixtures_dir):
         """Test conversión de carta de invitación"""
         docx_path = fixtures_dir / "carta_invitacion.docx"
@@ -387,7 +439,62 @@ class TestTCSDownloader:
         assert os.path.exists(result), f"El archivo PDF no fue creado en {result}"
         assert "carta_invitacion.pdf" in result, f"Nombre de archivo incorrecto: {result}"
 
+    @patch('shutil.which', return_value='/usr/bin/unoserver')
+    def test_convert_docx_to_pdf_prefers_unoserver(self, mock_which, downloader, fixtures_dir):
+        """Test que se usa unoserver antes que pandoc cuando está disponible"""
+        docx_path = fixtures_dir / "carta_invitacion.docx"
+
+        def fake_convert(src, dst):
+            with open(dst, 'wb') as f:
+                f.write(b'%PDF-1.4')
+
+        with patch.object(downloader, '_convert_via_unoserver', side_effect=fake_convert) as mock_convert, \
+             patch('pypandoc.convert_file') as mock_pandoc:
+            result = downloader.convert_docx_to_pdf(str(docx_path))
+
+        mock_convert.assert_called_once_with(str(docx_path), result)
+        mock_pandoc.assert_not_called()
+        assert result.endswith("carta_invitacion.pdf")
+
+    @patch('shutil.which', return_value='/usr/bin/unoserver')
+    def test_convert_docx_to_pdf_unoserver_without_pypandoc(self, mock_which, downloader, fixtures_dir):
+        """Test que unoserver funciona aunque pypandoc no esté instalado"""
+        docx_path = fixtures_dir / "carta_invitacion.docx"
+
+        def fake_convert(src, dst):
+            with open(dst, 'wb') as f:
+                f.write(b'%PDF-1.4')
+
+        with patch.object(downloader, '_convert_via_unoserver', side_effect=fake_convert), \
+             patch.dict(sys.modules, {'pypandoc': None}):
+            result = downloader.convert_docx_to_pdf(str(docx_path))
+
+        assert result.endswith("carta_invitacion.pdf")
+
+    def test_convert_docx_to_pdf_without_pypandoc(self, downloader, fixtures_dir):
+        """Test que sin pypandoc ni unoserver se lanza ConversionError"""
+        from modules.tcs_downloader.tcs_downloader import ConversionError
+        docx_path = fixtures_dir / "carta_invitacion.docx"
+
+        with patch('modules.tcs_downloader.tcs_downloader.unoserver_available', return_value=False), \
+             patch.dict(sys.modules, {'pypandoc': None}):
+            with pytest.raises(ConversionError):
+                downloader.convert_docx_to_pdf(str(docx_path))
+
+    @patch('subprocess.Popen')
+    @patch('modules.tcs_downloader.tcs_downloader._unoserver_listening', return_value=True)
+    def test_start_unoserver_reuses_running_server(self, mock_listening, mock_popen):
+        """Test que no se lanza otro LibreOffice si ya hay un unoserver escuchando"""
+        from modules.tcs_downloader.tcs_downloader import start_unoserver
+
+        start_unoserver()
+        start_unoserver()
+
+        mock_popen.assert_not_called()
+
     # Tests de integración
+    @pytest.mark.slow
+    @pytest.mark.xdist_group("libreoffice")
     def test_integration_zip_to_pdf(self, downloader, fixtures_dir):
         """Test integración: ZIP → DOCX → PDF"""
         zip_path = fixtures_dir / "documentos_pbc.zip"
@@ -424,8 +531,8 @@ class TestTCSDownloader:
         assert downloader.is_valid_document(filename) == True
 
     # Tests para el método facade process_tender_documents
-    @patch('requests.get')
-    def test_process_tender_documents_pdf_success(self, mock_get, downloader, fixtures_dir, tmp_path):
+    @patch('requests.Session.get')
+    def test_process_tender_documents_pdf_success(self, mock_get, downloader, tmp_path, fixture_bytes):
         """Test procesamiento completo con documento PDF"""
         # Mock de la API
         mock_api_response = {
@@ -442,15 +549,15 @@ class TestTCSDownloader:
         }
         
         # Mock de descarga PDF
-        pdf_content = (fixtures_dir / "pliego_bases_condiciones.pdf").read_bytes()
+        pdf_content = fixture_bytes["pliego_bases_condiciones.pdf"]
         
         # Mock para API response
         mock_api_response_obj = Mock()
-        mock_api_response_obj.json.return_value = mock_api_response
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
         
         # Mock para descarga
         mock_download_response = Mock()
-        mock_download_response.content = pdf_content
+        mock_download_response.iter_content.return_value = [pdf_content]
         
         # Configurar side_effect para manejar las dos llamadas
         mock_get.side_effect = [mock_api_response_obj, mock_download_response]
@@ -463,9 +570,13 @@ class TestTCSDownloader:
         assert os.path.exists(result)
         assert result.endswith('.pdf')
         assert "pliego_bases_condiciones.pdf" in result
+        # Los temporales de la licitación se eliminan al terminar
+        assert os.listdir(downloader._tmp_root) == []
     
-    @patch('requests.get')
-    def test_process_tender_documents_docx_success(self, mock_get, downloader, fixtures_dir, tmp_path):
+    @pytest.mark.slow
+    @pytest.mark.xdist_group("libreoffice")
+    @patch('requests.Session.get')
+    def test_process_tender_documents_docx_success(self, mock_get, downloader, tmp_path, fixture_bytes):
         """Test procesamiento completo con documento DOCX"""
         # Mock de la API
         mock_api_response = {
@@ -482,15 +593,15 @@ class TestTCSDownloader:
         }
         
         # Mock de descarga DOCX
-        docx_content = (fixtures_dir / "pliego_bases_condiciones.docx").read_bytes()
+        docx_content = fixture_bytes["pliego_bases_condiciones.docx"]
         
         # Mock para API response
         mock_api_response_obj = Mock()
-        mock_api_response_obj.json.return_value = mock_api_response
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
         
         # Mock para descarga
         mock_download_response = Mock()
-        mock_download_response.content = docx_content
+        mock_download_response.iter_content.return_value = [docx_content]
         
         # Configurar side_effect para manejar las dos llamadas
         mock_get.side_effect = [mock_api_response_obj, mock_download_response]
@@ -503,9 +614,66 @@ class TestTCSDownloader:
         assert os.path.exists(result)
         assert result.endswith('.pdf')
         assert "pliego_bases_condiciones.pdf" in result
-    
-    @patch('requests.get')
-    def test_process_tender_documents_zip_success(self, mock_get, downloader, fixtures_dir, tmp_path):
+
+    @patch('requests.Session.get')
+    def test_process_tender_documents_docx_without_conversion(self, mock_get, downloader, tmp_path, fixture_bytes):
+        """Test que con convert_to_pdf=False el DOCX se guarda sin convertir y se extrae su texto"""
+        mock_api_response = {
+            "tender": {
+                "documents": [
+                    {
+                        "id": "1",
+                        "title": "carta_invitacion.docx",
+                        "documentTypeDetails": "Carta de invitacion",
+                        "url": "https://example.com/doc.docx"
+                    }
+                ]
+            }
+        }
+
+        mock_api_response_obj = Mock()
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
+
+        mock_download_response = Mock()
+        mock_download_response.iter_content.return_value = [fixture_bytes["carta_invitacion.docx"]]
+
+        mock_get.side_effect = [mock_api_response_obj, mock_download_response]
+
+        with patch.object(downloader, 'convert_docx_to_pdf') as mock_convert:
+            result = downloader.process_tender_documents("12345", str(tmp_path), convert_to_pdf=False)
+
+        mock_convert.assert_not_called()
+        assert result.endswith("carta_invitacion.docx")
+        assert os.path.exists(result)
+        assert "invitamos a participar" in downloader.extract_text(result)
+
+    def test_extract_text_doc_with_pdf_to_markdown(self, downloader, fixtures_dir):
+        """Test que el PDF convertido desde un DOC se lee con la función pdf_to_markdown"""
+        converted_dir = tempfile.mkdtemp(dir=downloader._tmp_root)
+        converted_pdf = os.path.join(converted_dir, "pliego_bases_condiciones.pdf")
+        Path(converted_pdf).write_bytes((fixtures_dir / "pliego_bases_condiciones.pdf").read_bytes())
+        pdf_to_markdown = Mock(return_value="# Pliego")
+
+        with patch.object(downloader, 'convert_docx_to_pdf', return_value=converted_pdf):
+            result = downloader.extract_text(
+                str(fixtures_dir / "pliego_bases_condiciones.doc"), pdf_to_markdown=pdf_to_markdown
+            )
+
+        assert result == "# Pliego"
+        pdf_to_markdown.assert_called_once_with(converted_pdf)
+        assert not os.path.exists(converted_dir)
+
+    def test_extract_text_unsupported_format(self, downloader, fixtures_dir):
+        """Test extracción de texto con formato no soportado"""
+        from modules.tcs_downloader.tcs_downloader import ValidationError
+
+        with pytest.raises(ValidationError):
+            downloader.extract_text(str(fixtures_dir / "documentos_pbc.zip"))
+
+    @pytest.mark.slow
+    @pytest.mark.xdist_group("libreoffice")
+    @patch('requests.Session.get')
+    def test_process_tender_documents_zip_success(self, mock_get, downloader, tmp_path, fixture_bytes):
         """Test procesamiento completo con archivo ZIP"""
         # Mock de la API
         mock_api_response = {
@@ -522,15 +690,15 @@ class TestTCSDownloader:
         }
         
         # Mock de descarga ZIP
-        zip_content = (fixtures_dir / "documentos_pbc.zip").read_bytes()
+        zip_content = fixture_bytes["documentos_pbc.zip"]
         
         # Mock para API response
         mock_api_response_obj = Mock()
-        mock_api_response_obj.json.return_value = mock_api_response
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
         
         # Mock para descarga
         mock_download_response = Mock()
-        mock_download_response.content = zip_content
+        mock_download_response.iter_content.return_value = [zip_content]
         
         # Configurar side_effect para manejar las dos llamadas
         mock_get.side_effect = [mock_api_response_obj, mock_download_response]
@@ -567,20 +735,20 @@ class TestTCSDownloader:
         
         assert "output_directory no puede estar vacío" in str(exc_info.value)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_tender_documents_no_documents(self, mock_get, downloader, tmp_path):
         """Test cuando no hay documentos para la licitación"""
         from modules.tcs_downloader.tcs_downloader import DocumentNotFoundError
         
         mock_api_response = {"tender": {"documents": []}}
-        mock_get.return_value.json.return_value = mock_api_response
+        mock_get.return_value.content = json.dumps(mock_api_response).encode()
         
         with pytest.raises(DocumentNotFoundError) as exc_info:
             downloader.process_tender_documents("12345", str(tmp_path))
         
         assert "No se encontraron documentos para tender 12345" in str(exc_info.value)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_tender_documents_no_valid_documents(self, mock_get, downloader, tmp_path):
         """Test cuando no hay documentos válidos"""
         from modules.tcs_downloader.tcs_downloader import DocumentNotFoundError
@@ -597,14 +765,14 @@ class TestTCSDownloader:
                 ]
             }
         }
-        mock_get.return_value.json.return_value = mock_api_response
+        mock_get.return_value.content = json.dumps(mock_api_response).encode()
         
         with pytest.raises(DocumentNotFoundError) as exc_info:
             downloader.process_tender_documents("12345", str(tmp_path))
         
         assert "No se encontró documento PBC o carta de invitación" in str(exc_info.value)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_tender_documents_download_error(self, mock_get, downloader, tmp_path):
         """Test error en descarga"""
         from modules.tcs_downloader.tcs_downloader import DownloadError
@@ -624,7 +792,7 @@ class TestTCSDownloader:
         
         # Mock para la respuesta API
         mock_api_response_obj = Mock()
-        mock_api_response_obj.json.return_value = mock_api_response
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
         
         # Mock para error de descarga
         mock_download_error = Mock()
@@ -637,8 +805,8 @@ class TestTCSDownloader:
         
         assert "Error inesperado al descargar" in str(exc_info.value)
 
-    @patch('requests.get')
-    def test_process_tender_documents_with_integer_id(self, mock_get, downloader, fixtures_dir, tmp_path):
+    @patch('requests.Session.get')
+    def test_process_tender_documents_with_integer_id(self, mock_get, downloader, tmp_path, fixture_bytes):
         """Test procesamiento completo con tender_id como entero"""
         # Mock de la API
         mock_api_response = {
@@ -655,15 +823,15 @@ class TestTCSDownloader:
         }
         
         # Mock de descarga PDF
-        pdf_content = (fixtures_dir / "pliego_bases_condiciones.pdf").read_bytes()
+        pdf_content = fixture_bytes["pliego_bases_condiciones.pdf"]
         
         # Mock para API response
         mock_api_response_obj = Mock()
-        mock_api_response_obj.json.return_value = mock_api_response
+        mock_api_response_obj.content = json.dumps(mock_api_response).encode()
         
         # Mock para descarga
         mock_download_response = Mock()
-        mock_download_response.content = pdf_content
+        mock_download_response.iter_content.return_value = [pdf_content]
         
         # Configurar side_effect para manejar las dos llamadas
         mock_get.side_effect = [mock_api_response_obj, mock_download_response]
@@ -678,7 +846,7 @@ class TestTCSDownloader:
         
         # Verificar que se llamó a la API con el ID convertido a string
         expected_url = "https://www.contrataciones.gov.py/datos/api/v3/doc/tender/12345"
-        mock_get.assert_any_call(expected_url)
+        mock_get.assert_any_call(expected_url, timeout=(5, 30))
 
 
 # Configuración de pytest